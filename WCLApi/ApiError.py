@@ -0,0 +1,36 @@
+"""Module containing the API error for this package."""
+
+ERROR_BODY_SIZE = 512  # bytes
+
+
+class ApiError(ConnectionError):
+    """Error response of the API.
+
+    Only the start of the response body is kept, so a large error page does
+    not have to be read or copied into the message.
+    """
+
+    def __init__(self, status_code: int, endpoint: str, body: bytes = b"") -> None:
+        """
+        Initialize the ApiError class.
+
+        Args:
+            status_code (int): HTTP status code of the response.
+            endpoint (str): endpoint of the request.
+            body (bytes, optional): Start of the response body, at most
+                ERROR_BODY_SIZE bytes are kept. Defaults to b''.
+
+        Returns:
+            None.
+        """
+        super().__init__(status_code, endpoint)
+        self.status_code = status_code
+        self.endpoint = endpoint
+        self.body = body[:ERROR_BODY_SIZE]
+
+    def __str__(self) -> str:
+        return (
+            f"Request failed with code {self.status_code}"
+            f" and message : {self.body!r}"
+            f" for endpoint: {self.endpoint}"
+        )
@@ -0,0 +1,800 @@
+"""Module containing the asynchronous Api class."""
+from typing import (
+    Any,
+    Awaitable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from WCLApi.Warcraftlogs import (
+    _EVENTS_PARAM_MAP,
+    _GUILD_PARAM_MAP,
+    _RANKINGS_PARAM_MAP,
+    _TABLES_PARAM_MAP,
+    _build_params,
+    _extend_events,
+    _format_endpoint,
+    _server_slug,
+    RATE_LIMIT,
+    RATE_LIMIT_PERIOD,
+    USER_AGENT,
+    RETRY_BACKOFF_FACTOR,
+    RETRY_STATUS_FORCELIST,
+    RETRY_TOTAL,
+)
+from WCLApi.ApiError import ApiError
+from WCLApi.Cache import _loads
+from WCLApi.RateLimiter import RateLimiter
+from WCLApi.ReportQuery import ReportQuery
+import asyncio
+import httpx
+import logging
+
+logger = logging.getLogger(__name__)
+
+RETRY_BACKOFF_MAX = 120  # seconds
+
+
+class AsyncWCLApi:
+    """This class provides the asyncio counterpart of the WCLApi class.
+
+    Unlike WCLApi it does not cache queries, every call is sent to the API.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        base_url: Optional[str] = r"https://classic.warcraftlogs.com:443/v1/",
+        timeout: Optional[int] = 1,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        prefetch_pages: int = 4,
+        http2: bool = True,
+        rate_limit: Optional[float] = RATE_LIMIT,
+    ) -> None:
+        """
+        Initialize the AsyncWCLApi class. The underlying HTTP/2 capable httpx
+        client is created on first use, concurrent requests are multiplexed
+        over a single connection when the server supports HTTP/2. The
+        arguments after api_key are keyword-only, since there is no query_dir
+        or cache as in WCLApi.
+
+        Args:
+            api_key (str): Authentication api_key.
+            base_url (str, optional): Base URL for calls to the API.
+                Defaults to r'https://classic.warcraftlogs.com:443/v1/'
+            timeout (float, optional): Default timeout for API calls.
+                Defaults to 1.
+            max_connections (int, optional): Maximum number of simultaneous
+                connections. Defaults to 100.
+            max_keepalive_connections (int, optional): Maximum number of idle
+                connections kept alive. Defaults to 20.
+            prefetch_pages (int, optional): Number of event or ranking pages
+                requested concurrently once the size of a page is known,
+                1 disables prefetching. Defaults to 4.
+            http2 (bool, optional): Whether to negotiate HTTP/2, which needs
+                the h2 package. Defaults to True.
+            rate_limit (float, optional): Maximum number of requests per
+                RATE_LIMIT_PERIOD seconds, None disables rate limiting.
+                Defaults to RATE_LIMIT.
+
+        Returns:
+            None.
+
+        """
+        assert api_key is not None, "Please enter an api_key"
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.prefetch_pages = prefetch_pages
+        self.http2 = http2
+        self._rate_limiter = (
+            RateLimiter(rate_limit, RATE_LIMIT_PERIOD) if rate_limit else None
+        )
+        self._http: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """The httpx client used for all calls, created on first access."""
+        if self._http is None or self._http.is_closed:
+            # Retries connection failures, status codes are retried in _get.
+            transport = httpx.AsyncHTTPTransport(
+                http2=self.http2,
+                retries=RETRY_TOTAL,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                ),
+            )
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                params={"api_key": self.api_key},
+                headers={"Accept": "application/json", "User-Agent": USER_AGENT},
+                timeout=httpx.Timeout(self.timeout),
+                transport=transport,
+            )
+        return self._http
+
+    async def prewarm(self) -> None:
+        """
+        Open a pooled connection to the API with a HEAD request on the base
+        URL, so the first call does not pay for the DNS lookup and the TLS
+        handshake. Failures are ignored.
+
+        Returns:
+            None.
+        """
+        try:
+            await self.http.head("")
+        except httpx.HTTPError as e:
+            logger.debug(f"Prewarming the connection failed: {e}")
+
+    async def close(self) -> None:
+        """Close the underlying httpx client."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def __aenter__(self) -> "AsyncWCLApi":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def _get(
+        self, endpoint: str, params: Optional[Dict[str, Union[str, int]]] = None
+    ) -> Dict:
+        """
+        Send a GET request to the API, retrying on the same status codes and
+        with the same exponential backoff as the synchronous WCLApi class.
+
+        Args:
+            endpoint (str): endpoint for the request, relative to base_url.
+            params (dict, optional): query parameters for the request.
+                Defaults to None.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        query = None
+        if params:
+            # httpx sends bools as 'true', requests sends them as 'True'.
+            query = {
+                k: str(v) if isinstance(v, bool) else v for k, v in params.items()
+            }
+
+        for attempt in range(RETRY_TOTAL + 1):
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire_async()
+            resp = await self.http.get(endpoint, params=query)
+
+            if resp.status_code == 200:
+                return _loads(resp.content)
+
+            if resp.status_code not in RETRY_STATUS_FORCELIST or attempt == RETRY_TOTAL:
+                if resp.status_code == 401:
+                    raise ConnectionError("Renew authorization token.")
+
+                raise ApiError(resp.status_code, endpoint, resp.content)
+
+            retry_after = resp.headers.get("Retry-After")
+            if retry_after is not None and retry_after.isdigit():
+                delay = float(retry_after)
+            else:
+                delay = min(RETRY_BACKOFF_FACTOR * 2 ** attempt, RETRY_BACKOFF_MAX)
+            logger.debug(f"Retrying {endpoint} in {delay} seconds")
+            await asyncio.sleep(delay)
+
+        raise ConnectionError(f"Request failed for endpoint: {endpoint}")
+
+    async def get_guild_reports(
+        self,
+        server: str,
+        server_region: str,
+        guild_name: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        endpoint: str = r"reports/guild/:guildName/:serverName/:serverRegion",
+    ) -> List:
+        """
+        Send a GET /reports/guild request to the API, returns the guild reports.
+
+        The arguments are the same as for WCLApi.get_guild_reports.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        endpoint = _format_endpoint(
+            endpoint,
+            serverName=_server_slug(server),
+            serverRegion=server_region,
+            guildName=guild_name,
+        )
+
+        params = _build_params(_GUILD_PARAM_MAP, locals())
+
+        return await self._get(endpoint, params)
+
+    async def get_report_fights(
+        self, report_code: str, endpoint: str = r"report/fights/:report_code"
+    ) -> dict:
+        """
+        Send a GET /report/fights request to the API, returns the report
+        fights.
+
+        Args:
+            report_code (str): report code for the which the fights are to be
+                found.
+            endpoint (str, optional): endpoint for the request. Defaults to
+                r'report/fights/:report_code'.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        endpoint = _format_endpoint(endpoint, report_code=report_code)
+
+        return await self._get(endpoint)
+
+    async def get_many_report_fights(
+        self, report_codes: Iterable[str], concurrency: int = 16
+    ) -> List[dict]:
+        """
+        Request the fights of several reports concurrently.
+
+        Args:
+            report_codes (iterable of str): report codes for the which the
+                fights are to be found.
+            concurrency (int, optional): Maximum number of reports requested at
+                the same time. Defaults to 16.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            list(dict): The fights of every report, in the order of
+                report_codes.
+        """
+        return await self.get_many(
+            (self.get_report_fights(report_code) for report_code in report_codes),
+            concurrency,
+        )
+
+    async def get_many(
+        self, aws: Iterable[Awaitable[Any]], concurrency: int = 16
+    ) -> List[Any]:
+        """
+        Await several requests concurrently, at most concurrency at a time,
+        e.g. the fights and tables of all reports of a guild.
+
+        Args:
+            aws (iterable of awaitables): The requests, e.g. coroutines of the
+                methods of this class.
+            concurrency (int, optional): Maximum number of requests awaited at
+                the same time. Defaults to 16.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            list: The results, in the order of aws.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited(aw: Awaitable[Any]) -> Any:
+            async with semaphore:
+                return await aw
+
+        return await asyncio.gather(*(limited(aw) for aw in aws))
+
+    async def get_report_events(
+        self,
+        view: str,
+        report_code: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        hostility: Optional[int] = None,
+        sourceid: Optional[int] = None,
+        sourceinstance: Optional[int] = None,
+        sourceclass: Optional[str] = None,
+        targetid: Optional[int] = None,
+        targetinstance: Optional[int] = None,
+        targetclass: Optional[str] = None,
+        abilityid: Optional[int] = None,
+        death: Optional[int] = None,
+        options: Optional[int] = None,
+        cutoff: Optional[int] = None,
+        encounter: Optional[int] = None,
+        wipes: Optional[int] = None,
+        filter_exp: Optional[str] = None,
+        translate: Optional[bool] = None,
+        endpoint: str = "report/events/:view/:report_code",
+    ) -> Dict[Any, Any]:
+        """
+        Send GET /report/events requests to the API, following
+        nextPageTimestamp until all pages are loaded, returns the report events.
+
+        The arguments are the same as for WCLApi.get_report_events.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        query = ReportQuery(
+            view=view,
+            report_code=report_code,
+            start_time=start_time,
+            end_time=end_time,
+            hostility=hostility,
+            sourceid=sourceid,
+            sourceinstance=sourceinstance,
+            sourceclass=sourceclass,
+            targetid=targetid,
+            targetinstance=targetinstance,
+            targetclass=targetclass,
+            abilityid=abilityid,
+            death=death,
+            options=options,
+            cutoff=cutoff,
+            encounter=encounter,
+            wipes=wipes,
+            filter_exp=filter_exp,
+            translate=translate,
+        )
+        return await self.query_report_events(query, endpoint=endpoint)
+
+    async def query_report_events(
+        self, query: ReportQuery, endpoint: str = "report/events/:view/:report_code"
+    ) -> Dict[Any, Any]:
+        """
+        Send GET /report/events requests described by a ReportQuery to the
+        API, returns the report events.
+
+        Args:
+            query (ReportQuery): The events to be found.
+            endpoint (str, optional): endpoint for the request. Defaults to
+                r'report/events/:view/:report_code'.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        endpoint = _format_endpoint(
+            endpoint, view=query.view, report_code=query.report_code
+        )
+
+        params = query.params(_EVENTS_PARAM_MAP)
+
+        key = (endpoint, tuple(sorted((k, str(v)) for k, v in params.items())))
+        return await self._single_flight(key, self._paginate_events(endpoint, params))
+
+    async def _paginate_events(
+        self, endpoint: str, params: Dict[str, Union[str, int]]
+    ) -> Dict[Any, Any]:
+        """
+        Send GET /report/events requests until no nextPageTimestamp is returned,
+        returns the events of all pages.
+
+        Once the first page shows how much time a page covers, the rest of the
+        range is split into prefetch_pages windows of that size which are
+        requested concurrently. Every window still follows nextPageTimestamp,
+        so a bad estimate costs extra requests but never loses events.
+
+        Args:
+            endpoint (str): endpoint for the request.
+            params (dict): parameters for the request.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        cont = await self._get(endpoint, params)
+
+        next_timestamp = cont.get("nextPageTimestamp", 0)
+        if not next_timestamp:
+            return cont
+        logger.info(f"Loaded from new timestamp: {next_timestamp}")
+
+        events = cont["events"]
+        start = params.get("start", events[0]["timestamp"] if events else 0)
+        end = params.get("end")
+        window = next_timestamp - int(start)
+
+        bounds = [next_timestamp]
+        if window > 0:
+            for _ in range(self.prefetch_pages - 1):
+                bound = bounds[-1] + window
+                if end is not None and bound >= int(end):
+                    break
+                bounds.append(bound)
+
+        pages = await asyncio.gather(
+            *(
+                self._paginate_window(endpoint, params, window_start, window_end)
+                for window_start, window_end in zip(bounds, bounds[1:] + [end])
+            )
+        )
+        for page in pages:
+            _extend_events(events, page)
+        return cont
+
+    async def _paginate_window(
+        self,
+        endpoint: str,
+        params: Dict[str, Union[str, int]],
+        start: int,
+        end: Optional[int],
+    ) -> List[Dict]:
+        """
+        Send GET /report/events requests for a single time window, following
+        nextPageTimestamp within the window, returns the events.
+
+        Args:
+            endpoint (str): endpoint for the request.
+            params (dict): parameters for the request.
+            start (int): start of the window.
+            end (int, optional): end of the window, None for the end of the
+                report.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            list(dict): The events in the window.
+        """
+        params = dict(params, start=start)
+        if end is None:
+            params.pop("end", None)
+        else:
+            params["end"] = end
+
+        next_timestamp = -1
+        events: List[Dict] = []
+
+        while next_timestamp != 0:
+
+            if next_timestamp > 0:
+                params["start"] = next_timestamp
+
+            resp_json = await self._get(endpoint, params)
+            _extend_events(events, resp_json["events"])
+
+            next_timestamp = resp_json.get("nextPageTimestamp", 0)
+            if next_timestamp:
+                logger.info(f"Loaded from new timestamp: {next_timestamp}")
+
+        return events
+
+    async def _single_flight(self, key: Hashable, coro: Awaitable[Any]) -> Any:
+        """
+        Await coro, unless the same query is already running, in which case
+        its result is awaited and shared instead.
+
+        Args:
+            key (hashable): Key identifying the query.
+            coro (awaitable): Coroutine performing the query.
+
+        Returns:
+            The result of coro.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coro)
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.debug(f"Waiting for identical request in flight: {key}")
+            coro.close()
+        # Shielded so a cancelled caller does not cancel the shared request.
+        return await asyncio.shield(task)
+
+    async def get_many_report_events(
+        self, queries: Iterable[ReportQuery], concurrency: int = 16
+    ) -> List[Dict[Any, Any]]:
+        """
+        Request the events of several ReportQuery objects concurrently.
+
+        Args:
+            queries (iterable of ReportQuery): The events to be found.
+            concurrency (int, optional): Maximum number of queries requested
+                at the same time. Defaults to 16.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            list(dict): The events of every query, in the order of queries.
+        """
+        return await self.get_many(
+            (self.query_report_events(query) for query in queries), concurrency
+        )
+
+    async def get_report_events_range(
+        self,
+        view: str,
+        report_code: str,
+        windows: Iterable[Tuple[int, int]],
+        **kwargs: Any,
+    ) -> Dict[Any, Any]:
+        """
+        Request the report events for several time windows concurrently and
+        merge them into a single result.
+
+        Args:
+            view (str): view for the which the events are to be found.
+            report_code (str): report code for the which the events are to be
+                found.
+            windows (iterable of (int, int)): Non overlapping (start_time,
+                end_time) windows in ascending order, e.g. the start and end
+                times of the fights of the report.
+            **kwargs: Additional arguments for get_report_events.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        pages = await asyncio.gather(
+            *(
+                self.get_report_events(
+                    view, report_code, start_time=start, end_time=end, **kwargs
+                )
+                for start, end in windows
+            )
+        )
+        if not pages:
+            return {"events": []}
+
+        # The pages may be shared with other callers, so merge into a new dict.
+        cont = dict(pages[0])
+        cont["events"] = [event for page in pages for event in page["events"]]
+        return cont
+
+    async def get_report_tables(
+        self,
+        view: str,
+        report_code: str,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        hostility: Optional[int] = None,
+        by: Optional[str] = None,
+        sourceid: Optional[int] = None,
+        sourceinstance: Optional[int] = None,
+        sourceclass: Optional[str] = None,
+        targetid: Optional[int] = None,
+        targetinstance: Optional[int] = None,
+        targetclass: Optional[str] = None,
+        abilityid: Optional[int] = None,
+        options: Optional[int] = None,
+        cutoff: Optional[int] = None,
+        encounter: Optional[int] = None,
+        wipes: Optional[int] = None,
+        filter_exp: Optional[str] = None,
+        translate: Optional[bool] = None,
+        endpoint: str = "report/tables/:view/:report_code",
+    ) -> Dict[Any, Any]:
+        """
+        Send a GET /report/tables request to the API, returns the report
+        tables.
+
+        The arguments are the same as for WCLApi.get_report_tables.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        query = ReportQuery(
+            view=view,
+            report_code=report_code,
+            start_time=start_time,
+            end_time=end_time,
+            hostility=hostility,
+            by=by,
+            sourceid=sourceid,
+            sourceinstance=sourceinstance,
+            sourceclass=sourceclass,
+            targetid=targetid,
+            targetinstance=targetinstance,
+            targetclass=targetclass,
+            abilityid=abilityid,
+            options=options,
+            cutoff=cutoff,
+            encounter=encounter,
+            wipes=wipes,
+            filter_exp=filter_exp,
+            translate=translate,
+        )
+        return await self.query_report_tables(query, endpoint=endpoint)
+
+    async def query_report_tables(
+        self, query: ReportQuery, endpoint: str = "report/tables/:view/:report_code"
+    ) -> Dict[Any, Any]:
+        """
+        Send a GET /report/tables request described by a ReportQuery to the
+        API, returns the report tables.
+
+        Args:
+            query (ReportQuery): The tables to be found.
+            endpoint (str, optional): endpoint for the request.
+                Defaults to r'report/tables/:view/:report_code'.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        endpoint = _format_endpoint(
+            endpoint, view=query.view, report_code=query.report_code
+        )
+
+        params = query.params(_TABLES_PARAM_MAP)
+
+        return await self._get(endpoint, params)
+
+    async def get_many_report_tables(
+        self, queries: Iterable[ReportQuery], concurrency: int = 16
+    ) -> List[Dict[Any, Any]]:
+        """
+        Request the tables of several ReportQuery objects concurrently.
+
+        Args:
+            queries (iterable of ReportQuery): The tables to be found.
+            concurrency (int, optional): Maximum number of queries requested
+                at the same time. Defaults to 16.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            list(dict): The tables of every query, in the order of queries.
+        """
+        return await self.get_many(
+            (self.query_report_tables(query) for query in queries), concurrency
+        )
+
+    async def get_encounter_rankings(
+        self,
+        encounter_id: int,
+        metric: Optional[str] = "speed",
+        size: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        partition: Optional[int] = None,
+        game_class: Optional[int] = None,
+        spec: Optional[int] = None,
+        bracket: Optional[int] = None,
+        server: Optional[str] = None,
+        region: Optional[str] = None,
+        page: Optional[int] = None,
+        limit: Optional[int] = None,
+        filter: Optional[str] = None,
+        include_combatant_info: Optional[bool] = False,
+        endpoint: str = "rankings/encounter/:encounter_id",
+    ) -> Union[Iterable[Dict], Dict]:
+        """
+        Send a GET /rankings/encounter request to the API, returns the
+        encounter rankings.
+
+        The arguments are the same as for WCLApi.get_encounter_rankings.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        endpoint = _format_endpoint(endpoint, encounter_id=encounter_id)
+
+        params = _build_params(_RANKINGS_PARAM_MAP, locals())
+
+        cont = await self._paginate_rankings(endpoint, params)
+
+        logger.debug(
+            f"Content obtained successfully: {len(cont['rankings'])} rankings found"
+        )
+        return cont
+
+    async def _paginate_rankings(
+        self, endpoint: str, params: Dict[str, Union[str, int]]
+    ) -> Dict[Any, Any]:
+        """
+        Send GET /rankings/encounter requests until hasMorePages is false,
+        returns the rankings of all pages.
+
+        Once the first page shows the page size and the total count, the
+        following pages are requested prefetch_pages at a time. Without a
+        count the pages are requested one by one.
+
+        Args:
+            endpoint (str): endpoint for the request.
+            params (dict): parameters for the request.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        cont = await self._get(endpoint, params)
+
+        per_page = len(cont["rankings"])
+        last_page = None
+        if per_page and cont.get("count"):
+            last_page = -(-int(cont["count"]) // per_page)
+
+        while cont["hasMorePages"]:
+            first = cont["page"] + 1
+            batch = 1
+            if last_page is not None and last_page > first:
+                batch = min(self.prefetch_pages, last_page - first + 1)
+
+            pages = await asyncio.gather(
+                *(
+                    self._get(endpoint, dict(params, page=page))
+                    for page in range(first, first + batch)
+                )
+            )
+            for resp_json in pages:
+                cont["rankings"].extend(resp_json["rankings"])
+                logger.debug(f"Additional page loaded: {resp_json['page']}")
+            cont["page"] = pages[-1]["page"]
+            cont["hasMorePages"] = pages[-1]["hasMorePages"]
+
+        return cont
+
+    async def get_zones(self, endpoint: str = r"zones") -> Iterable[Dict]:
+        """
+        Send a /zones request to the API, returns the available zones.
+
+        Args:
+            endpoint (str, optional): API Endpoint. Defaults to r'/zones'.
+
+        Raises:
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        return await self._get(endpoint)
@@ -0,0 +1,674 @@
+"""Module containing the query cache backends for this package."""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+import atexit
+import gzip
+import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:  # the optional "fast" extra, no wheels for some platforms
+    import json
+
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRACE = 300  # seconds
+DEFAULT_MEMORY_TTL = 30  # seconds
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# DiskCache files start with this magic and the time they go stale.
+HEADER_MAGIC = b"WCL\x01"
+_HEADER = struct.Struct("<4sd")
+
+
+def _loads(data: Any) -> Any:
+    """
+    Decode JSON with orjson, or with the json module if it is not installed.
+
+    Args:
+        data: bytes-like JSON document.
+
+    Returns:
+        The decoded value.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data))
+
+
+def _dumps(value: Any, indent: bool = False) -> bytes:
+    """
+    Encode JSON with orjson, or with the json module if it is not installed.
+
+    Args:
+        value: JSON serializable value.
+        indent (bool, optional): Whether to indent the document.
+            Defaults to False.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(
+        value,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=(",", ": ") if indent else (",", ":"),
+    ).encode()
+
+
+def _header(stale_at: Optional[float]) -> bytes:
+    """
+    Pack the header of a DiskCache file.
+
+    Args:
+        stale_at (float): Time the value goes stale, None if never.
+
+    Returns:
+        bytes: The header.
+    """
+    return _HEADER.pack(HEADER_MAGIC, stale_at if stale_at is not None else math.inf)
+
+
+def _too_stale(stale_at: float, max_stale: Optional[float]) -> bool:
+    """
+    Check whether a value has been stale for longer than allowed.
+
+    Args:
+        stale_at (float): Time the value goes stale.
+        max_stale (float): Seconds the value may have been stale for, None
+            allows any age.
+
+    Returns:
+        bool: Whether the value should not be returned.
+    """
+    return max_stale is not None and stale_at + max_stale <= time.time()
+
+
+class Cache(ABC):
+    """Base class for the query caches used by the WCLApi class."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a fresh cached value.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            The cached value, or None on a miss or when the value is stale.
+        """
+        raise NotImplementedError
+
+    def get_stale(self, key: str, max_stale: Optional[float] = None) -> Optional[Any]:
+        """
+        Get a cached value even if it is stale, used to revalidate it or when
+        the API fails.
+
+        Args:
+            key (str): Cache key.
+            max_stale (float, optional): Seconds the value may have been stale
+                for, None returns it however long ago it went stale.
+                Defaults to None.
+
+        Returns:
+            The cached value, or None on a miss or when it has been stale for
+            longer than max_stale.
+        """
+        return self.get(key)
+
+    def _get_with_expiry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Get a fresh cached value along with the time it goes stale, so that a
+        MemoryCache in front of this cache does not keep it any longer.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            tuple: The cached value and the time it goes stale, inf if never
+            or unknown. None on a miss or when the value is stale.
+        """
+        value = self.get(key)
+        if value is None:
+            return None
+        return value, math.inf
+
+    @abstractmethod
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Store a value in the cache.
+
+        Args:
+            key (str): Cache key.
+            value: JSON serializable value.
+            ttl (float, optional): Seconds the value stays fresh. None keeps it
+                fresh forever. Defaults to None.
+            meta (dict, optional): Human readable description of the query
+                the key was derived from, for debugging. Defaults to None.
+
+        Returns:
+            None.
+        """
+        raise NotImplementedError
+
+    def touch(self, key: str, ttl: Optional[float] = None) -> None:
+        """
+        Reset the time a cached value goes stale, after the API confirmed it
+        is unchanged. Stores the value again unless the cache can update the
+        time on its own.
+
+        Args:
+            key (str): Cache key.
+            ttl (float, optional): Seconds the value stays fresh. None keeps it
+                fresh forever. Defaults to None.
+
+        Returns:
+            None.
+        """
+        value = self.get_stale(key)
+        if value is not None:
+            self.set(key, value, ttl=ttl)
+
+    def flush(self) -> None:
+        """Write out values the cache is holding back, if any."""
+
+    def prefetch(self, keys: Iterable[str]) -> None:
+        """
+        Start loading values that are about to be read, if supported.
+
+        Args:
+            keys (iterable of str): Cache keys.
+
+        Returns:
+            None.
+        """
+
+
+class DiskCache(Cache):
+    """Cache storing every value as a compressed JSON file in a directory.
+
+    Every file starts with a small header holding the time its value goes
+    stale, so freshness does not depend on file times, which are changed by
+    copying files and mean different things on different platforms. Values
+    stored without a ttl, and files written without a header, never go stale.
+
+    With write_back set, values are held in memory and written in batches by
+    flush, which also runs when the buffer fills up and at interpreter exit.
+    With meta set, the description of every query is written to a
+    .meta.json file next to its value, at the cost of a second write.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        compresslevel: Optional[int] = 1,
+        index: bool = False,
+        write_back: int = 0,
+        codec: str = "gzip",
+        meta: bool = False,
+    ) -> None:
+        """
+        Initialize the DiskCache class.
+
+        Args:
+            directory (str): Path to the directory where queries should be
+                stored.
+            compresslevel (int, optional): Level the files are compressed
+                with, None stores plain JSON. Plain, gzip and zstd files are
+                all read. Defaults to 1.
+            index (bool, optional): Whether to list the directory once and
+                answer misses from that listing instead of the filesystem.
+                Files written by other processes afterwards are not seen.
+                Defaults to False.
+            write_back (int, optional): Number of values buffered in memory
+                before they are written together, 0 writes every value right
+                away. Buffered values are lost if the process is killed.
+                Defaults to 0.
+            codec (str, optional): 'gzip', or 'zstd' which decompresses
+                faster and requires the zstandard package. Defaults to 'gzip'.
+            meta (bool, optional): Whether to write the description of every
+                query to a .meta.json file for debugging. Defaults to False.
+
+        Raises:
+            ValueError: If the codec is unknown.
+            ImportError: If the zstd codec is used without zstandard.
+
+        Returns:
+            None.
+        """
+        if codec not in ("gzip", "zstd"):
+            raise ValueError(f"Unknown codec: {codec}")
+        if codec == "zstd" and zstandard is None:
+            raise ImportError("The zstd codec requires the zstandard package.")
+        self.directory = directory
+        # Joined once, file paths are then built by concatenation.
+        self._prefix = os.path.join(os.fspath(directory), "")
+        self.compresslevel = compresslevel
+        self.index = index
+        self.write_back = write_back
+        self.codec = codec
+        self.meta = meta
+        self._names: Optional[Set[str]] = None
+        self._pending: Dict[
+            str, Tuple[Any, Optional[float], Optional[Dict[str, Any]]]
+        ] = {}
+        self._pending_lock = threading.Lock()
+        if write_back:
+            atexit.register(self.flush)
+
+    def _listed(self, key: str) -> bool:
+        if not self.index:
+            return True
+        if self._names is None:
+            try:
+                with os.scandir(self.directory) as entries:
+                    self._names = {entry.name for entry in entries}
+            except FileNotFoundError:
+                self._names = set()
+        return key in self._names
+
+    def get(self, key: str) -> Optional[Any]:
+        found = self._read(key, max_stale=0)
+        return found[0] if found is not None else None
+
+    def get_stale(self, key: str, max_stale: Optional[float] = None) -> Optional[Any]:
+        found = self._read(key, max_stale)
+        return found[0] if found is not None else None
+
+    def _get_with_expiry(self, key: str) -> Optional[Tuple[Any, float]]:
+        return self._read(key, max_stale=0)
+
+    def _read(
+        self, key: str, max_stale: Optional[float]
+    ) -> Optional[Tuple[Any, float]]:
+        pending = self._pending.get(key)
+        if pending is not None:
+            value, stale_at, _ = pending
+            if stale_at is None:
+                return value, math.inf
+            if _too_stale(stale_at, max_stale):
+                return None
+            return value, stale_at
+        if not self._listed(key):
+            return None
+        try:
+            f = open(self._prefix + key, "rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            # Parse straight from the page cache instead of copying into bytes.
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    offset = 0
+                    stale_at = math.inf
+                    if view[:4] == HEADER_MAGIC:
+                        stale_at = _HEADER.unpack_from(view)[1]
+                        if _too_stale(stale_at, max_stale):
+                            return None
+                        offset = _HEADER.size
+                    with view[offset:] as body:
+                        return self._decode(key, body), stale_at
+
+    def _decode(self, key: str, body: memoryview) -> Any:
+        if body[:2] == GZIP_MAGIC:
+            return _loads(gzip.decompress(body))
+        if body[:4] == ZSTD_MAGIC:
+            if zstandard is None:
+                raise ImportError(f"Reading {key} requires the zstandard package.")
+            return _loads(zstandard.ZstdDecompressor().decompress(body))
+        return _loads(body)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        stale_at = time.time() + ttl if ttl is not None else None
+        if self.write_back:
+            with self._pending_lock:
+                self._pending[key] = (value, stale_at, meta)
+                full = len(self._pending) >= self.write_back
+            if full:
+                self.flush()
+            return
+        self._store(key, value, stale_at, meta)
+
+    def touch(self, key: str, ttl: Optional[float] = None) -> None:
+        stale_at = time.time() + ttl if ttl is not None else None
+        with self._pending_lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                self._pending[key] = (pending[0], stale_at, pending[2])
+                return
+        # Overwrite the stale time in the header instead of the whole file.
+        try:
+            with open(self._prefix + key, "r+b") as f:
+                if f.read(len(HEADER_MAGIC)) == HEADER_MAGIC:
+                    f.seek(0)
+                    f.write(_header(stale_at))
+                    return
+        except FileNotFoundError:
+            return
+        # Files written without a header are stored again.
+        super().touch(key, ttl)
+
+    def flush(self) -> None:
+        with self._pending_lock:
+            pending = list(self._pending.items())
+        for key, (value, stale_at, meta) in pending:
+            self._store(key, value, stale_at, meta)
+        # Keep values until they are on disk so readers never miss them.
+        with self._pending_lock:
+            for key, entry in pending:
+                if self._pending.get(key) is entry:
+                    del self._pending[key]
+
+    def _store(
+        self,
+        key: str,
+        value: Any,
+        stale_at: Optional[float],
+        meta: Optional[Dict[str, Any]],
+    ) -> None:
+        data = _dumps(value)
+        if self.compresslevel is not None and self.codec == "zstd":
+            data = zstandard.ZstdCompressor(level=self.compresslevel).compress(data)
+        elif self.compresslevel is not None:
+            data = gzip.compress(data, compresslevel=self.compresslevel, mtime=0)
+        self._write(key, data, _header(stale_at))
+        if self._names is not None:
+            self._names.add(key)
+        if meta is not None and self.meta:
+            self._write(
+                f"{os.path.splitext(key)[0]}.meta.json", _dumps(meta, indent=True)
+            )
+
+    def _write(self, name: str, data: bytes, header: bytes = b"") -> None:
+        f_path = self._prefix + name
+        # Write to a temporary file first so readers never see a partial file.
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except FileNotFoundError:
+            # Create the directory on the first write only, not on every write.
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(data)
+            os.replace(tmp_path, f_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class RedisCache(Cache):
+    """Cache storing every value in a Redis hash with an expiry time."""
+
+    def __init__(
+        self,
+        client: Optional[Any] = None,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "wcl:",
+        grace: float = DEFAULT_GRACE,
+    ) -> None:
+        """
+        Initialize the RedisCache class. Requires the redis package.
+
+        Args:
+            client (redis.Redis, optional): Redis client to use. If omitted a
+                client is created from url. Defaults to None.
+            url (str, optional): Redis url used when no client is given.
+                Defaults to 'redis://localhost:6379/0'.
+            prefix (str, optional): Prefix for all keys. Defaults to 'wcl:'.
+            grace (float, optional): Seconds a stale value is kept around to
+                be served when the API fails. Defaults to DEFAULT_GRACE.
+
+        Returns:
+            None.
+        """
+        if client is None:
+            import redis
+
+            client = redis.Redis(connection_pool=redis.ConnectionPool.from_url(url))
+        self.client = client
+        self.prefix = prefix
+        self.grace = grace
+
+    def _load(self, key: str) -> Optional[dict]:
+        record = self.client.hgetall(self.prefix + key)
+        if not record:
+            return None
+        return {k.decode(): v for k, v in record.items()}
+
+    def get(self, key: str) -> Optional[Any]:
+        found = self._get_with_expiry(key)
+        return found[0] if found is not None else None
+
+    def _get_with_expiry(self, key: str) -> Optional[Tuple[Any, float]]:
+        record = self._load(key)
+        if record is None:
+            return None
+        stale_at = float(record["stale_at"])
+        if stale_at and _too_stale(stale_at, 0):
+            return None
+        return _loads(record["body"]), stale_at or math.inf
+
+    def get_stale(self, key: str, max_stale: Optional[float] = None) -> Optional[Any]:
+        record = self._load(key)
+        if record is None:
+            return None
+        stale_at = float(record["stale_at"])
+        if stale_at and _too_stale(stale_at, max_stale):
+            return None
+        return _loads(record["body"])
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        now = time.time()
+        name = self.prefix + key
+        mapping = {
+            "ts": now,
+            "stale_at": now + ttl if ttl is not None else 0,
+            "body": _dumps(value),
+        }
+        if meta is not None:
+            mapping["meta"] = _dumps(meta)
+        pipe = self.client.pipeline()
+        pipe.hset(name, mapping=mapping)
+        self._expire(pipe, name, ttl)
+        pipe.execute()
+
+    def touch(self, key: str, ttl: Optional[float] = None) -> None:
+        name = self.prefix + key
+        if not self.client.exists(name):
+            return
+        pipe = self.client.pipeline()
+        pipe.hset(name, "stale_at", time.time() + ttl if ttl is not None else 0)
+        self._expire(pipe, name, ttl)
+        pipe.execute()
+
+    def _expire(self, pipe: Any, name: str, ttl: Optional[float]) -> None:
+        if ttl is not None:
+            pipe.expire(name, int(ttl + self.grace))
+        else:
+            pipe.persist(name)
+
+
+class MemoryCache(Cache):
+    """Bounded in-process LRU cache in front of another cache.
+
+    Values are kept as encoded JSON, so hits skip the backend and any
+    decompression while every caller still gets its own copy to modify. The
+    cache holds at most maxsize values and max_bytes of JSON, larger values
+    are only stored in the backend. Values can be prefetched from the backend
+    by a pair of worker threads while the caller is still busy with the
+    previous one.
+    """
+
+    def __init__(
+        self,
+        backend: Cache,
+        maxsize: int = 512,
+        ttl: Optional[float] = DEFAULT_MEMORY_TTL,
+        max_bytes: int = DEFAULT_MEMORY_BYTES,
+    ) -> None:
+        """
+        Initialize the MemoryCache class.
+
+        Args:
+            backend (Cache): Cache that is read on a miss and written through.
+            maxsize (int, optional): Maximum number of values kept in memory.
+                Defaults to 512.
+            ttl (float, optional): Seconds a value is kept in memory at most,
+                it is dropped earlier when it goes stale in the backend. None
+                keeps it until it is evicted or goes stale.
+                Defaults to DEFAULT_MEMORY_TTL.
+            max_bytes (int, optional): Maximum size of the encoded values kept
+                in memory. Defaults to DEFAULT_MEMORY_BYTES.
+
+        Returns:
+            None.
+        """
+        self.backend = backend
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._loading: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _forget(self, key: str) -> None:
+        self._size -= len(self._entries.pop(key)[1])
+
+    def _remember(self, key: str, value: Any, stale_at: float) -> None:
+        data = _dumps(value)
+        now = time.time()
+        expires_at = stale_at
+        if self.ttl is not None:
+            expires_at = min(expires_at, now + self.ttl)
+        with self._lock:
+            if key in self._entries:
+                self._forget(key)
+            for expired in [k for k, e in self._entries.items() if e[0] <= now]:
+                self._forget(expired)
+            if len(data) > self.max_bytes or expires_at <= now:
+                return
+            self._entries[key] = (expires_at, data)
+            self._size += len(data)
+            while len(self._entries) > self.maxsize or self._size > self.max_bytes:
+                self._forget(next(iter(self._entries)))
+
+    def get(self, key: str) -> Optional[Any]:
+        found = self._get_with_expiry(key)
+        return found[0] if found is not None else None
+
+    def _get_with_expiry(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._entries.move_to_end(key)
+                    return _loads(entry[1]), entry[0]
+                self._forget(key)
+            loading = self._loading.get(key)
+        if loading is not None:
+            # Read the prefetched value, or the backend if it was too large.
+            loading.result()
+            return self._get_with_expiry(key)
+        return self._load(key)
+
+    def _load(self, key: str) -> Optional[Tuple[Any, float]]:
+        found = self.backend._get_with_expiry(key)
+        if found is not None:
+            self._remember(key, *found)
+        return found
+
+    def _prefetched(self, key: str) -> None:
+        try:
+            self._load(key)
+        finally:
+            with self._lock:
+                del self._loading[key]
+
+    def prefetch(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                if key in self._entries or key in self._loading:
+                    continue
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=2, thread_name_prefix="WCLApi-prefetch"
+                    )
+                self._loading[key] = self._executor.submit(self._prefetched, key)
+
+    def get_stale(self, key: str, max_stale: Optional[float] = None) -> Optional[Any]:
+        # Only the backend knows when a value it returned goes stale.
+        return self.backend.get_stale(key, max_stale)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.backend.set(key, value, ttl=ttl, meta=meta)
+        self._remember(key, value, time.time() + ttl if ttl is not None else math.inf)
+
+    def touch(self, key: str, ttl: Optional[float] = None) -> None:
+        self.backend.touch(key, ttl=ttl)
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else math.inf
+        if self.ttl is not None:
+            expires_at = min(expires_at, now + self.ttl)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            if expires_at <= now:
+                self._forget(key)
+            else:
+                self._entries[key] = (expires_at, entry[1])
+
+    def flush(self) -> None:
+        self.backend.flush()
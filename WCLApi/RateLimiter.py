@@ -0,0 +1,68 @@
+"""Module containing the request rate limiter for this package."""
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Token bucket limiting the rate of requests, shared by threads and tasks.
+
+    The bucket starts full, so bursts of up to max_rate requests are sent
+    right away. Once it is empty every caller reserves the next free slot and
+    waits for it, which spreads the requests out evenly instead of letting
+    them all run into 429 responses and back off at the same time.
+    """
+
+    def __init__(self, max_rate: float, time_period: float = 60) -> None:
+        """
+        Initialize the RateLimiter class.
+
+        Args:
+            max_rate (float): Maximum number of requests per time_period.
+            time_period (float, optional): Length of the period in seconds.
+                Defaults to 60.
+
+        Returns:
+            None.
+        """
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._tokens = float(max_rate)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Take a token from the bucket, going into debt when it is empty.
+
+        Returns:
+            float: Seconds to wait before the token may be used.
+        """
+        with self._lock:
+            now = time.monotonic()
+            rate = self.max_rate / self.time_period
+            self._tokens = min(
+                float(self.max_rate), self._tokens + (now - self._updated_at) * rate
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / rate
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            logger.debug(f"Rate limited, waiting {delay:.2f} seconds")
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Wait without blocking the event loop until a request may be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            logger.debug(f"Rate limited, waiting {delay:.2f} seconds")
+            await asyncio.sleep(delay)
@@ -0,0 +1,68 @@
+"""Module containing the report query descriptor for this package."""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+
+@dataclass(frozen=True)
+class ReportQuery:
+    """Description of a /report/events or /report/tables query.
+
+    The fields match the arguments of WCLApi.get_report_events and
+    WCLApi.get_report_tables, fields an endpoint does not use are ignored.
+    """
+
+    view: str
+    report_code: str
+    start_time: Optional[int] = None
+    end_time: Optional[int] = None
+    hostility: Optional[int] = None
+    by: Optional[str] = None
+    sourceid: Optional[int] = None
+    sourceinstance: Optional[int] = None
+    sourceclass: Optional[str] = None
+    targetid: Optional[int] = None
+    targetinstance: Optional[int] = None
+    targetclass: Optional[str] = None
+    abilityid: Optional[int] = None
+    death: Optional[int] = None
+    options: Optional[int] = None
+    cutoff: Optional[int] = None
+    encounter: Optional[int] = None
+    wipes: Optional[int] = None
+    filter_exp: Optional[str] = None
+    translate: Optional[bool] = None
+
+    def params(
+        self, param_map: Iterable[Tuple[str, str]]
+    ) -> Dict[str, Union[str, int]]:
+        """
+        Build the request parameters of the query.
+
+        Args:
+            param_map (iterable of (str, str)): (API parameter, field) pairs
+                of the endpoint.
+
+        Returns:
+            dict: The parameters that are set.
+        """
+        return {
+            api_name: value
+            for api_name, field in param_map
+            if (value := getattr(self, field)) is not None
+        }
+
+    def key_args(self, fields: Iterable[str]) -> Dict[str, Any]:
+        """
+        Collect the fields identifying a cached query.
+
+        Args:
+            fields (iterable of str): fields that identify the query.
+
+        Returns:
+            dict: The fields that are set and their values.
+        """
+        return {
+            field: value
+            for field in fields
+            if (value := getattr(self, field)) is not None
+        }
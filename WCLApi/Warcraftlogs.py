@@ -1,26 +1,446 @@
 """Module containing the base Api class."""
-from typing import Any, Dict, Iterable, List, Optional, Union
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from requests.exceptions import (
+    ChunkedEncodingError,
+    ConnectionError as RequestsConnectionError,
+    ContentDecodingError,
+    RequestException,
+    SSLError as RequestsSSLError,
+)
 from requests.models import Response
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError, SSLError
+from urllib3.util import make_headers
 from urllib3.util.retry import Retry
 from requests_toolbelt import sessions
+from WCLApi.ApiError import ERROR_BODY_SIZE, ApiError
+from WCLApi.Cache import DEFAULT_GRACE, Cache, DiskCache, MemoryCache, _loads
+from WCLApi.RateLimiter import RateLimiter
+from WCLApi.ReportQuery import ReportQuery
 from WCLApi.TimeoutHttpAdapter import TimeoutHttpAdapter
-import inspect
-import json
+import contextlib
+import functools
+import hashlib
+import ijson
 import logging
-import os
+import re
+import string
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+RETRY_TOTAL = 6
+RETRY_BACKOFF_FACTOR = 1
+RETRY_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+RATE_LIMIT = 300  # requests per RATE_LIMIT_PERIOD
+RATE_LIMIT_PERIOD = 60  # seconds
+USER_AGENT = "WCLApi/0.4.0 (+https://github.com/doorknob6/WCLApi)"
+
+# Seconds a cached query stays fresh, per query type, None keeps it forever.
+CACHE_POLICY = {
+    "events": 60,
+    "tables": 30,
+    "fights": 30,
+    "guild": 300,
+    "rankings": 300,
+    "zones": 86400,
+}
+# Seconds after its end a report is considered completed, queries of a
+# completed report are cached forever.
+COMPLETED_REPORT_AGE = 86400
+
+# (API parameter, method argument) pairs of the report view endpoints.
+_EVENTS_PARAM_MAP = (
+    ("start", "start_time"),
+    ("end", "end_time"),
+    ("hostility", "hostility"),
+    ("sourceid", "sourceid"),
+    ("sourceinstance", "sourceinstance"),
+    ("sourceclass", "sourceclass"),
+    ("targetid", "targetid"),
+    ("targetinstance", "targetinstance"),
+    ("targetclass", "targetclass"),
+    ("abilityid", "abilityid"),
+    ("death", "death"),
+    ("options", "options"),
+    ("cutoff", "cutoff"),
+    ("encounter", "encounter"),
+    ("wipes", "wipes"),
+    ("filter", "filter_exp"),
+    ("translate", "translate"),
+)
+_TABLES_PARAM_MAP = (
+    ("start", "start_time"),
+    ("end", "end_time"),
+    ("hostility", "hostility"),
+    ("by", "by"),
+    ("sourceid", "sourceid"),
+    ("sourceinstance", "sourceinstance"),
+    ("sourceclass", "sourceclass"),
+    ("targetid", "targetid"),
+    ("targetinstance", "targetinstance"),
+    ("targetclass", "targetclass"),
+    ("abilityid", "abilityid"),
+    ("options", "options"),
+    ("cutoff", "cutoff"),
+    ("encounter", "encounter"),
+    ("wipes", "wipes"),
+    ("filter", "filter_exp"),
+    ("translate", "translate"),
+)
+# (API parameter, method argument) pairs of the other endpoints.
+_GUILD_PARAM_MAP = (
+    ("start", "start_time"),
+    ("end", "end_time"),
+)
+_RANKINGS_PARAM_MAP = (
+    ("metric", "metric"),
+    ("size", "size"),
+    ("difficulty", "difficulty"),
+    ("partition", "partition"),
+    ("class", "game_class"),
+    ("spec", "spec"),
+    ("bracket", "bracket"),
+    ("server", "server"),
+    ("region", "region"),
+    ("page", "page"),
+    ("limit", "limit"),
+    ("filter", "filter"),
+    ("includeCombatantInfo", "include_combatant_info"),
+)
+
+
+def _build_params(
+    param_map: Iterable[Tuple[str, str]], args: Dict[str, Any]
+) -> Dict[str, Union[str, int]]:
+    """
+    Build the request parameters from the arguments of a method.
+
+    Args:
+        param_map (iterable of (str, str)): (API parameter, argument) pairs of
+            the endpoint.
+        args (dict): The arguments of the method, e.g. its locals().
+
+    Returns:
+        dict: The parameters that are set.
+    """
+    return {
+        api_name: value
+        for api_name, arg in param_map
+        if (value := args[arg]) is not None
+    }
+
+
+# max-age directive of a Cache-Control header.
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+# :name placeholder of an endpoint.
+_PLACEHOLDER = re.compile(r":([A-Za-z_]\w*)")
+
+
+@functools.lru_cache(maxsize=None)
+def _endpoint_template(endpoint: str) -> string.Template:
+    """
+    Compile an endpoint with :name placeholders into a string.Template once.
+
+    Args:
+        endpoint (str): endpoint, e.g. r'report/fights/:report_code'.
+
+    Returns:
+        string.Template: Template substituting the placeholders in one pass.
+    """
+    return string.Template(
+        _PLACEHOLDER.sub(r"${\1}", endpoint.replace("$", "$$"))
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _server_slug(server: str) -> str:
+    """
+    Convert a server name into the slug used in endpoints.
+
+    Args:
+        server (str): server name, e.g. 'Nethergarde Keep'.
+
+    Returns:
+        str: The slug, e.g. 'nethergarde-keep'.
+    """
+    return server.lower().replace(" ", "-")
+
+
+def _format_endpoint(endpoint: str, **values: Any) -> str:
+    """
+    Fill in the :name placeholders of an endpoint.
+
+    Args:
+        endpoint (str): endpoint, e.g. r'report/fights/:report_code'.
+        **values: Values for the placeholders.
+
+    Returns:
+        str: The endpoint for the request.
+    """
+    return _endpoint_template(endpoint).safe_substitute(values)
+
+
+@functools.lru_cache(maxsize=4096)
+def _file_name(query: str, key: Tuple[Any, ...]) -> str:
+    """
+    Hash the key of a cached query into its file name once.
+
+    Args:
+        query (str): Name of the query, e.g. 'events'.
+        key (tuple): report_code, view and the sorted arguments of the query.
+
+    Returns:
+        str: The file name, e.g. 'wcl_events_<digest>.json'.
+    """
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+    return f"wcl_{query}_{digest}.json"
+
+
+@contextlib.contextmanager
+def _raw_read_errors() -> Iterator[None]:
+    """
+    Raise the urllib3 errors of reads from a raw response body as the requests
+    exceptions Response.iter_content raises for them, so that a timeout or a
+    truncated body is a RequestException like it is for resp.json().
+
+    Raises:
+        ChunkedEncodingError: If the body was truncated.
+        ContentDecodingError: If the body could not be decoded.
+        requests.exceptions.ConnectionError: If reading the body timed out.
+        requests.exceptions.SSLError: On an SSL error while reading the body.
+    """
+    try:
+        yield
+    except ProtocolError as exc:
+        raise ChunkedEncodingError(exc) from exc
+    except DecodeError as exc:
+        raise ContentDecodingError(exc) from exc
+    except ReadTimeoutError as exc:
+        raise RequestsConnectionError(exc) from exc
+    except SSLError as exc:
+        raise RequestsSSLError(exc) from exc
+
+
+def _read_body(resp: Response) -> bytearray:
+    """
+    Read a streamed response body into a single buffer, avoiding the copy
+    resp.content makes when it joins the chunks of the body.
+
+    Args:
+        resp (Response): response requested with stream=True.
+
+    Raises:
+        RequestException: If reading the body failed or timed out.
+
+    Returns:
+        bytearray: The decoded response body.
+    """
+    length = resp.headers.get("Content-Length")
+    if length is not None and "Content-Encoding" not in resp.headers:
+        # The exact size is known, read straight into a preallocated buffer.
+        body = bytearray(int(length))
+        with memoryview(body) as view, _raw_read_errors():
+            read = 0
+            while read < len(body):
+                n = resp.raw.readinto(view[read:])
+                if not n:
+                    break
+                read += n
+        # A short body raises, unless urllib3 does not enforce Content-Length.
+        del body[read:]
+        return body
+    body = bytearray()
+    for chunk in resp.iter_content(chunk_size=1 << 16):
+        body += chunk
+    return body
+
+
+def _extend_events(events: List[Dict], more: List[Dict]) -> None:
+    """
+    Append more to events, skipping the events at the boundary timestamp that
+    both lists contain when adjacent windows or pages overlap.
+
+    Args:
+        events (list): events sorted by timestamp, extended in place.
+        more (list): events sorted by timestamp, starting at or after the last
+            event in events.
+
+    Returns:
+        None.
+    """
+    if events and more:
+        boundary = more[0].get("timestamp")
+        tail = []
+        for event in reversed(events):
+            if event.get("timestamp") != boundary:
+                break
+            tail.append(event)
+        skip = 0
+        while skip < len(more) and skip < len(tail) and more[skip] in tail:
+            skip += 1
+        more = more[skip:]
+    events.extend(more)
+
+
+def _parse_page(
+    stream: Any,
+    field: str,
+    items: List[Dict],
+    extend: Callable[[List, List], None] = list.extend,
+) -> Dict[Any, Any]:
+    """
+    Incrementally parse a page of a paginated response, merging the items of
+    the paginated field straight into items instead of keeping a copy of the
+    page.
+
+    Args:
+        stream: file-like object returning the JSON response body.
+        field (str): Name of the paginated list, e.g. 'events'.
+        items (list): accumulator the items of the page are appended to.
+        extend (callable, optional): Appends the items of the page to items,
+            e.g. _extend_events. Defaults to list.extend.
+
+    Returns:
+        dict: The page without its items, e.g. count and nextPageTimestamp.
+    """
+    page = {}
+    # kvitems builds every top level value in the C backend of ijson.
+    for key, value in ijson.kvitems(stream, "", use_float=True):
+        if key == field:
+            extend(items, value)
+        else:
+            page[key] = value
+    return page
+
+
+def _iter_page(stream: Any, field: str, page: Dict[Any, Any]) -> Iterator[Any]:
+    """
+    Incrementally parse a page of a paginated response, yielding the items of
+    the paginated field one at a time as they are read from the stream.
+
+    Args:
+        stream: file-like object returning the JSON response body.
+        field (str): Name of the paginated list, e.g. 'events'.
+        page (dict): accumulator the other top level values of the page, e.g.
+            count and nextPageTimestamp, are stored in once the page is read.
+
+    Yields:
+        The items of the paginated field.
+    """
+    item_prefix = f"{field}.item"
+    page_builder = ijson.ObjectBuilder()
+    item_builder: Optional[ijson.ObjectBuilder] = None
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if item_builder is not None:
+            item_builder.event(event, value)
+            if prefix == item_prefix and event in ("end_map", "end_array"):
+                yield item_builder.value
+                item_builder = None
+        elif prefix == item_prefix:
+            if event in ("start_map", "start_array"):
+                item_builder = ijson.ObjectBuilder()
+                item_builder.event(event, value)
+            else:
+                yield value
+        elif prefix == field or (prefix == "" and value == field):
+            continue  # the list itself and its key are left out of the page
+        elif not prefix.startswith(item_prefix):
+            page_builder.event(event, value)
+    page.update(page_builder.value)
+
+
+def _next_events_page(
+    page: Dict[Any, Any], params: Dict[str, Union[str, int]]
+) -> Optional[Dict[str, Union[str, int]]]:
+    """
+    Get the parameters of the /report/events page following page.
+
+    Args:
+        page (dict): The current page.
+        params (dict): parameters of the current page.
+
+    Returns:
+        dict: The parameters of the next page, None on the last page.
+    """
+    next_timestamp = page.get("nextPageTimestamp", 0)
+    if not next_timestamp:
+        return None
+    logger.info(f"Loaded from new timestamp: {next_timestamp}")
+    return dict(params, start=next_timestamp)
+
+
+def _next_rankings_page(
+    page: Dict[Any, Any], params: Dict[str, Union[str, int]]
+) -> Optional[Dict[str, Union[str, int]]]:
+    """
+    Get the parameters of the /rankings/encounter page following page.
+
+    Args:
+        page (dict): The current page.
+        params (dict): parameters of the current page.
+
+    Returns:
+        dict: The parameters of the next page, None on the last page.
+    """
+    if not page["hasMorePages"]:
+        return None
+    logger.debug(f"Additional page loaded: {page['page'] + 1}")
+    return dict(params, page=page["page"] + 1)
+
 
 class WCLApi:
     """This class provides the base class for API calls."""
 
+    # Arguments of get_report_events that identify a cached query, in order.
+    _EVENTS_KEY_ARGS = (
+        "start_time",
+        "end_time",
+        "hostility",
+        "sourceid",
+        "sourceinstance",
+        "sourceclass",
+        "targetid",
+        "targetinstance",
+        "targetclass",
+        "abilityid",
+        "death",
+        "options",
+        "cutoff",
+        "encounter",
+        "wipes",
+        "filter_exp",
+        "translate",
+    )
+    # Arguments of get_report_tables that identify a cached query, in order.
+    _TABLES_KEY_ARGS = tuple(arg for _, arg in _TABLES_PARAM_MAP)
+    # Connection pools shared by all instances, by (timeout, pool_size).
+    _adapters: Dict[Tuple[Optional[float], int], TimeoutHttpAdapter] = {}
+    _adapters_lock = threading.Lock()
+
     def __init__(
         self,
         api_key: str,
         query_dir: Optional[str] = None,
         base_url: Optional[str] = r"https://classic.warcraftlogs.com:443/v1/",
         timeout: Optional[int] = 1,
+        pool_size: int = 100,
+        cache: Optional[Cache] = None,
+        memory_cache_size: int = 512,
+        prewarm: bool = False,
+        rate_limit: Optional[float] = RATE_LIMIT,
     ) -> None:
         """
         Initialize the WCLApi class and optionally attach an authentication token.
@@ -32,6 +452,20 @@ class WCLApi:
             base_url (str, optional): Base URL for calls to the API.
                 Defaults to r'https://classic.warcraftlogs.com:443/v1/'
             timeout (float, optional): Default timeout for API calls. Defaults to 1.
+            pool_size (int, optional): Maximum number of connections kept alive
+                per host, raise it when calling the API from many threads.
+                Defaults to 100.
+            cache (Cache, optional): Cache for the query results, e.g. a
+                RedisCache. If omitted and query_dir is given, a DiskCache in
+                query_dir is used. Defaults to None.
+            memory_cache_size (int, optional): Number of cached queries kept
+                in memory in front of the cache, 0 disables it. Every call
+                still returns a new copy of the result. Defaults to 512.
+            prewarm (bool, optional): Whether to open a connection to the API
+                in a background thread, see prewarm. Defaults to False.
+            rate_limit (float, optional): Maximum number of requests per
+                RATE_LIMIT_PERIOD seconds, None disables rate limiting.
+                Defaults to RATE_LIMIT.
 
         Returns:
             None.
@@ -40,16 +474,282 @@ class WCLApi:
         assert api_key is not None, "Please enter an api_key"
         self.api_key = api_key
         self.query_dir = query_dir
-        self.http = sessions.BaseUrlSession(base_url)
-        self.http.hooks["response"] = [
-            lambda response, *args, **kwargs: response.raise_for_status()
-        ]
-        retries = Retry(
-            total=6, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504]
+        if cache is None and query_dir is not None:
+            cache = DiskCache(query_dir)
+        if cache is not None and memory_cache_size > 0:
+            cache = MemoryCache(cache, maxsize=memory_cache_size)
+        self.cache = cache
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._rate_limiter = (
+            RateLimiter(rate_limit, RATE_LIMIT_PERIOD) if rate_limit else None
         )
-        adapter = TimeoutHttpAdapter(timeout=timeout, max_retries=retries)
+        self.http = sessions.BaseUrlSession(base_url)
+        # Merged into the params of every request by the session.
+        self.http.params = {"api_key": api_key}
+        adapter = self._get_adapter(timeout, pool_size)
         self.http.mount("https://", adapter)
         self.http.mount("http://", adapter)
+        # Advertises br (and zstd) only when urllib3 is able to decode it.
+        accept_encoding = make_headers(accept_encoding=True)["accept-encoding"]
+        self.http.headers.update(
+            {
+                "Accept": "application/json",
+                "Accept-Encoding": accept_encoding,
+                "Connection": "keep-alive",
+                "User-Agent": USER_AGENT,
+            }
+        )
+        if prewarm:
+            threading.Thread(target=self.prewarm, daemon=True).start()
+
+    @classmethod
+    def _get_adapter(
+        cls, timeout: Optional[float], pool_size: int
+    ) -> TimeoutHttpAdapter:
+        """
+        Get the adapter shared by all instances with the same timeout and pool
+        size, so their keep-alive connections are reused across instances.
+
+        Args:
+            timeout (float): Default timeout for API calls.
+            pool_size (int): Maximum number of connections kept alive per host.
+
+        Returns:
+            TimeoutHttpAdapter: The shared adapter.
+        """
+        with cls._adapters_lock:
+            adapter = cls._adapters.get((timeout, pool_size))
+            if adapter is None:
+                retries = Retry(
+                    total=RETRY_TOTAL,
+                    backoff_factor=RETRY_BACKOFF_FACTOR,
+                    status_forcelist=RETRY_STATUS_FORCELIST,
+                    # Return the last response so _request raises an ApiError.
+                    raise_on_status=False,
+                )
+                adapter = TimeoutHttpAdapter(
+                    timeout=timeout,
+                    max_retries=retries,
+                    pool_connections=32,
+                    pool_maxsize=pool_size,
+                    pool_block=False,
+                )
+                cls._adapters[(timeout, pool_size)] = adapter
+            return adapter
+
+    def prewarm(self) -> None:
+        """
+        Open a pooled connection to the API with a HEAD request on the base
+        URL, so the first call does not pay for the DNS lookup and the TLS
+        handshake. Failures are ignored.
+
+        Returns:
+            None.
+        """
+        try:
+            self.http.head("")
+        except RequestException as e:
+            logger.debug(f"Prewarming the connection failed: {e}")
+
+    def _request(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Union[str, int]]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+    ) -> Response:
+        """
+        Send a GET request to the API, returns the successful response.
+
+        Args:
+            endpoint (str): endpoint for the request.
+            params (dict, optional): parameters for the request.
+                Defaults to None.
+            headers (dict, optional): additional headers for the request.
+                Defaults to None.
+            stream (bool, optional): Whether to leave the body unread.
+                Defaults to False.
+
+        Raises:
+            ValueError: If the Api class is not initialized prior to execution.
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            Response: The response, with status 200 or 304.
+        """
+        if not hasattr(self, "api_key"):
+            raise ValueError("Please initialise the Api class.")
+
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire()
+
+        resp = self.http.get(endpoint, params=params, headers=headers, stream=stream)
+
+        if resp.status_code in (200, 304):
+            return resp
+
+        with resp:
+            if resp.status_code == 401:
+                raise ConnectionError("Renew authorization token.")
+
+            if stream:
+                with _raw_read_errors():
+                    body = resp.raw.read(ERROR_BODY_SIZE, decode_content=True)
+            else:
+                body = resp.content
+            raise ApiError(resp.status_code, endpoint, body)
+
+    def _get(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Union[str, int]]] = None,
+        parse: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """
+        Send a GET request to the API, returns the decoded response.
+
+        Args:
+            endpoint (str): endpoint for the request.
+            params (dict, optional): parameters for the request.
+                Defaults to None.
+            parse (callable, optional): Parser for the raw response stream.
+                If omitted the whole response is decoded as JSON.
+                Defaults to None.
+
+        Raises:
+            ValueError: If the Api class is not initialized prior to execution.
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        with self._request(endpoint, params, stream=True) as resp:
+            if parse is None:
+                return _loads(_read_body(resp))
+            resp.raw.decode_content = True
+            with _raw_read_errors():
+                return parse(resp.raw)
+
+    def _get_revalidated(
+        self,
+        query: str,
+        key: str,
+        endpoint: str,
+        params: Optional[Dict[str, Union[str, int]]],
+        meta: Dict[str, Any],
+    ) -> Any:
+        """
+        Send a GET request to the API unless a fresh result is cached. A stale
+        cached result is revalidated with a conditional request, so an
+        unchanged result is not transferred again. The Cache-Control max-age,
+        no-cache and no-store directives of the API take precedence over
+        CACHE_POLICY, a max-age of 0 or no-cache revalidates every time.
+
+        Args:
+            query (str): Query type, selecting the CACHE_POLICY.
+            key (str): Cache key of the query.
+            endpoint (str): endpoint for the request.
+            params (dict): parameters for the request, or None.
+            meta (dict): Human readable description of the query.
+
+        Raises:
+            ValueError: If the Api class is not initialized prior to execution.
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        if self.cache is None:
+            return self._get(endpoint, params)
+
+        record = self.cache.get(key)
+        if record is not None:
+            return record["body"]
+
+        record = self.cache.get_stale(key)
+        headers: Optional[Dict[str, str]] = None
+        if record is not None:
+            headers = {}
+            if record.get("etag"):
+                headers["If-None-Match"] = record["etag"]
+            if record.get("last_modified"):
+                headers["If-Modified-Since"] = record["last_modified"]
+
+        with self._request(endpoint, params, headers=headers, stream=True) as resp:
+            modified = resp.status_code != 304 or record is None
+            if not modified:
+                logger.debug(f"Not modified, using cached result for: {endpoint}")
+            else:
+                record = {
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                    "body": _loads(_read_body(resp)),
+                }
+
+        cache_control = resp.headers.get("Cache-Control", "").lower()
+        if "no-store" in cache_control:
+            return record["body"]
+        if "no-cache" in cache_control:
+            max_age: Optional[int] = 0
+        else:
+            match = _MAX_AGE.search(cache_control)
+            max_age = int(match.group(1)) if match is not None else None
+        fights = record["body"] if query == "fights" else None
+        ttl = self._cache_ttl(query, meta.get("report_code"), fights, max_age)
+        if modified:
+            self.cache.set(key, record, ttl=ttl, meta=meta)
+        else:
+            # The cached result is unchanged, only its stale time is reset.
+            self.cache.touch(key, ttl=ttl)
+        return record["body"]
+
+    def _cache_ttl(
+        self,
+        query: str,
+        report_code: Optional[str] = None,
+        fights: Optional[Dict] = None,
+        max_age: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        Get the number of seconds a query stays fresh in the cache. Queries of
+        a report that ended over COMPLETED_REPORT_AGE ago never go stale, the
+        end of the report is taken from its cached fights. Events of a report
+        whose fights are not cached never go stale either, as before
+        CACHE_POLICY existed, since nothing shows the report is still live.
+
+        Args:
+            query (str): Query type, selecting the CACHE_POLICY.
+            report_code (str, optional): report code of a report query.
+                Defaults to None.
+            fights (dict, optional): The fights of the report, looked up in the
+                cache when omitted. Defaults to None.
+            max_age (float, optional): The max-age sent by the API, used
+                instead of the CACHE_POLICY. 0 makes the query stale right
+                away, even for a completed report. Defaults to None.
+
+        Returns:
+            float: The ttl, or None to keep the query forever.
+        """
+        if max_age == 0:
+            return 0
+        if report_code and self.cache is not None:
+            if fights is None:
+                record = self.cache.get_stale(
+                    self.make_file_name("fights", report_code, "", {})
+                )
+                fights = record["body"] if record is not None else None
+            if fights is None or "end" not in fights:
+                if query == "events":
+                    return None
+            elif fights["end"] / 1000 < time.time() - COMPLETED_REPORT_AGE:
+                return None
+        if max_age is not None:
+            return max_age
+        return CACHE_POLICY.get(query)
 
     def get_guild_reports(
         self,
@@ -88,40 +788,25 @@ class WCLApi:
             dict(JsonApiObject): JsonApi object in the form of a dict.
 
         """
-        try:
-            api_key = self.api_key
-        except AttributeError:
-            raise ValueError("Please initialise the Api class.")
-
-        headers: Dict[str, Union[str, int]] = {}
-
-        endpoint = (
-            endpoint.replace(":serverName", server.lower().replace(" ", "-"))
-            .replace(":serverRegion", server_region)
-            .replace(":guildName", guild_name)
+        endpoint = _format_endpoint(
+            endpoint,
+            serverName=_server_slug(server),
+            serverRegion=server_region,
+            guildName=guild_name,
         )
 
-        params: Dict[str, Union[str, int]] = {}
-
-        params.update({"api_key": api_key})
-        if start_time is not None:
-            params.update({"start": start_time})
-        if end_time is not None:
-            params.update({"end": end_time})
-
-        resp = self.http.get(endpoint, headers=headers, params=params)
+        params = _build_params(_GUILD_PARAM_MAP, locals())
 
-        if resp.status_code == 200:
-            cont = resp.json()
-            return cont
-
-        if resp.status_code == 401:
-            raise ConnectionError("Renew authorization token.")
+        key_args = {
+            "server": server,
+            "server_region": server_region,
+            "guild_name": guild_name,
+            **params,
+        }
+        key = self.make_file_name("guild", "", "", key_args)
 
-        raise ConnectionError(
-            f"Request failed with code {resp.status_code}"
-            f" and message : {resp.content}"
-            f" for endpoint: {endpoint}"
+        return self._get_revalidated(
+            "guild", key, endpoint, params, {"query": "guild", **key_args}
         )
 
     def get_report_fights(
@@ -145,33 +830,69 @@ class WCLApi:
         Returns:
             dict(JsonApiObject): JsonApi object in the form of a dict.
         """
-        try:
-            api_key = self.api_key
-        except AttributeError:
-            raise ValueError("Please initialise the Api class.")
+        key = self.make_file_name("fights", report_code, "", {})
 
-        headers: Dict[str, Union[str, int]] = {}
+        endpoint = _format_endpoint(endpoint, report_code=report_code)
+
+        return self._get_revalidated(
+            "fights",
+            key,
+            endpoint,
+            None,
+            {"query": "fights", "report_code": report_code},
+        )
+
+    def get_many_report_fights(
+        self, report_codes: Iterable[str], concurrency: int = 16
+    ) -> List[dict]:
+        """
+        Request the fights of several reports concurrently from a pool of
+        threads sharing this instance's connection pool and cache.
 
-        endpoint = endpoint.replace(":report_code", report_code)
+        Args:
+            report_codes (iterable of str): report codes for the which the
+                fights are to be found.
+            concurrency (int, optional): Maximum number of reports requested at
+                the same time. Defaults to 16.
 
-        params: Dict[str, Union[str, int]] = {}
+        Raises:
+            ValueError: If the Api class is not initialized prior to execution.
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
 
-        params.update({"api_key": api_key})
+        Returns:
+            list(dict): The fights of every report, in the order of
+                report_codes.
+        """
+        return self.get_many(
+            (functools.partial(self.get_report_fights, c) for c in report_codes),
+            concurrency,
+        )
 
-        resp = self.http.get(endpoint, headers=headers, params=params)
+    def get_many(
+        self, calls: Iterable[Callable[[], Any]], concurrency: int = 16
+    ) -> List[Any]:
+        """
+        Run several requests concurrently from a pool of threads sharing this
+        instance's connection pool and cache, e.g. the fights and tables of
+        all reports of a guild.
 
-        if resp.status_code == 200:
-            cont = resp.json()
-            return cont
+        Args:
+            calls (iterable of callables): The requests, e.g.
+                functools.partial(api.get_report_fights, report_code).
+            concurrency (int, optional): Number of threads. Defaults to 16.
 
-        if resp.status_code == 401:
-            raise ConnectionError("Renew authorization token.")
+        Raises:
+            ValueError: If the Api class is not initialized prior to execution.
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
 
-        raise ConnectionError(
-            f"Request failed with code {resp.status_code}"
-            f" and message : {resp.content}"
-            f" for endpoint: {endpoint}"
-        )
+        Returns:
+            list: The results, in the order of calls.
+        """
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(call) for call in calls]
+            return [future.result() for future in futures]
 
     def get_report_events(
         self,
@@ -293,107 +1014,255 @@ class WCLApi:
             dict(JsonApiObject): JsonApi object in the form of a dict.
 
         """
-        try:
-            api_key = self.api_key
-        except AttributeError:
-            raise ValueError("Please initialise the Api class.")
+        query = ReportQuery(
+            view=view,
+            report_code=report_code,
+            start_time=start_time,
+            end_time=end_time,
+            hostility=hostility,
+            sourceid=sourceid,
+            sourceinstance=sourceinstance,
+            sourceclass=sourceclass,
+            targetid=targetid,
+            targetinstance=targetinstance,
+            targetclass=targetclass,
+            abilityid=abilityid,
+            death=death,
+            options=options,
+            cutoff=cutoff,
+            encounter=encounter,
+            wipes=wipes,
+            filter_exp=filter_exp,
+            translate=translate,
+        )
+        return self.query_report_events(query, endpoint=endpoint)
+
+    def query_report_events(
+        self, query: ReportQuery, endpoint: str = "report/events/:view/:report_code"
+    ) -> Dict[Any, Any]:
+        """
+        Send a GET /report/events request described by a ReportQuery to the
+        API, returns the report events.
+
+        Args:
+            query (ReportQuery): The events to be found.
+            endpoint (str, optional): endpoint for the request. Defaults to
+                r'report/events/:view/:report_code'.
+
+        Raises:
+            ValueError: If the Api class is not initialized prior to execution.
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
 
-        current_frame = inspect.currentframe()
-        if current_frame is not None:
-            argspec = inspect.getargvalues(current_frame)
-            content = self.load_saved_query("events", argspec)
-            if content is not None:
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        view, report_code = query.view, query.report_code
+        key_args = query.key_args(self._EVENTS_KEY_ARGS)
+        content = self.load_saved_query("events", report_code, view, key_args)
+        if content is not None:
+            return content
+
+        endpoint = _format_endpoint(endpoint, view=view, report_code=report_code)
+
+        params = query.params(_EVENTS_PARAM_MAP)
+
+        def fetch() -> Dict[Any, Any]:
+            try:
+                cont = self._get_pages(
+                    endpoint, params, "events", _next_events_page, _extend_events
+                )
+            except (ApiError, RequestException):
+                content = self.load_stale_query("events", report_code, view, key_args)
+                if content is None:
+                    raise
+                logger.warning(f"Request failed, using stale events for: {endpoint}")
                 return content
 
-        headers: Dict[str, Union[str, int]] = {}
-
-        endpoint = endpoint.replace(":view", view).replace(":report_code", report_code)
-
-        params: Dict[str, Union[str, int]] = {}
-
-        if start_time is not None:
-            params.update({"start": start_time})
-        if end_time is not None:
-            params.update({"end": end_time})
-        if hostility is not None:
-            params.update({"hostility": hostility})
-        if sourceid is not None:
-            params.update({"sourceid": sourceid})
-        if sourceinstance is not None:
-            params.update({"sourceinstance": sourceinstance})
-        if sourceclass is not None:
-            params.update({"sourceclass": sourceclass})
-        if targetid is not None:
-            params.update({"targetid": targetid})
-        if targetinstance is not None:
-            params.update({"targetinstance": targetinstance})
-        if targetclass is not None:
-            params.update({"targetclass": targetclass})
-        if abilityid is not None:
-            params.update({"abilityid": abilityid})
-        if death is not None:
-            params.update({"death": death})
-        if options is not None:
-            params.update({"options": options})
-        if cutoff is not None:
-            params.update({"cutoff": cutoff})
-        if encounter is not None:
-            params.update({"encounter": encounter})
-        if wipes is not None:
-            params.update({"wipes": wipes})
-        if filter_exp is not None:
-            params.update({"filter": filter_exp})
-        if translate is not None:
-            params.update({"translate": translate})
-
-        params.update({"api_key": api_key})
-
-        next_timestamp = -1
-        resp = None
-        cont: Dict = {}
-
-        while next_timestamp != 0:
-
-            if next_timestamp > 0:
-                params.update({"start": next_timestamp})
-
-            resp = self.http.get(endpoint, headers=headers, params=params)
-
-            if resp is not None:
-
-                if resp.status_code == 200:
-                    resp_json = resp.json()
-                    if cont is not None:
-                        cont["events"] += resp_json["events"]
-                    else:
-                        cont = resp.json()
-
-                    try:
-                        next_timestamp = resp_json["nextPageTimestamp"]
-                        logger.info(
-                            "Loaded from new timestamp: "
-                            f"{resp_json['nextPageTimestamp']}"
-                        )
-                    except KeyError:
-                        next_timestamp = 0
-                else:
-                    break
+            self.save_query("events", report_code, view, key_args, cont)
+            return cont
 
-        if resp:
-            if resp.status_code == 200:
-                self.save_query("events", argspec, cont)
-                return cont
+        key = self.make_file_name("events", report_code, view, key_args)
+        return self._single_flight(key, fetch)
 
-            if resp.status_code == 401:
-                raise ConnectionError("Renew authorization token.")
+    def iter_report_events(
+        self, query: ReportQuery, endpoint: str = "report/events/:view/:report_code"
+    ) -> Iterator[Dict[Any, Any]]:
+        """
+        Send GET /report/events requests described by a ReportQuery to the API,
+        yields the report events while the responses are being read.
+
+        Unlike query_report_events no page is kept in memory and nothing is
+        cached, which suits aggregations over large reports. Stop iterating to
+        skip the remaining pages.
+
+        Args:
+            query (ReportQuery): The events to be found.
+            endpoint (str, optional): endpoint for the request. Defaults to
+                r'report/events/:view/:report_code'.
+
+        Raises:
+            ValueError: If the Api class is not initialized prior to execution.
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Yields:
+            dict: The events of the report, in order.
+        """
+        endpoint = _format_endpoint(
+            endpoint, view=query.view, report_code=query.report_code
+        )
+        params: Optional[Dict[str, Union[str, int]]] = query.params(_EVENTS_PARAM_MAP)
+
+        # The events yielded at the last timestamp, which the next page starts
+        # with again; skipped like _extend_events does.
+        tail: List[Dict] = []
+        while params is not None:
+            page: Dict[Any, Any] = {}
+            repeated: Optional[int] = 0
+            with self._request(endpoint, params, stream=True) as resp:
+                resp.raw.decode_content = True
+                with _raw_read_errors():
+                    for event in _iter_page(resp.raw, "events", page):
+                        if repeated is not None:
+                            if repeated < len(tail) and event in tail:
+                                repeated += 1
+                                continue
+                            repeated = None
+                        if tail and event.get("timestamp") == tail[0].get("timestamp"):
+                            tail.append(event)
+                        else:
+                            tail = [event]
+                        yield event
+            params = _next_events_page(page, params)
+
+    def get_many_report_events(
+        self, queries: Iterable[ReportQuery], concurrency: int = 16
+    ) -> List[Dict[Any, Any]]:
+        """
+        Request the events of several ReportQuery objects concurrently from a
+        pool of threads.
+
+        Args:
+            queries (iterable of ReportQuery): The events to be found.
+            concurrency (int, optional): Maximum number of queries requested
+                at the same time. Defaults to 16.
+
+        Raises:
+            ValueError: If the Api class is not initialized prior to execution.
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            list(dict): The events of every query, in the order of queries.
+        """
+        return self.get_many(
+            (functools.partial(self.query_report_events, q) for q in queries),
+            concurrency,
+        )
+
+    def prefetch_report_events(self, queries: Iterable[ReportQuery]) -> None:
+        """
+        Start reading the cached events of several ReportQuery objects in the
+        background, so that the query_report_events calls that follow are
+        answered from memory. Queries that are not cached are ignored.
+
+        Args:
+            queries (iterable of ReportQuery): The events about to be queried.
+
+        Returns:
+            None.
+        """
+        if self.cache is None:
+            return None
+        self.cache.prefetch(
+            self.make_file_name(
+                "events", q.report_code, q.view, q.key_args(self._EVENTS_KEY_ARGS)
+            )
+            for q in queries
+        )
+
+    def _single_flight(self, key: str, fetch: Callable[[], Any]) -> Any:
+        """
+        Run fetch, unless the same query is already running in another thread,
+        in which case its result is awaited and shared instead.
+
+        Args:
+            key (str): Key identifying the query.
+            fetch (callable): Function performing the query.
 
-        if resp is not None:
-            raise ConnectionError(
-                f"Request failed with code {resp.status_code}"
-                f" and message : {resp.content}"
-                f" for endpoint: {endpoint}"
+        Returns:
+            The result of fetch.
+        """
+        with self._inflight_lock:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                future: Future = Future()
+                self._inflight[key] = future
+
+        if inflight is not None:
+            logger.debug(f"Waiting for identical request in flight: {key}")
+            return inflight.result()
+
+        try:
+            result = fetch()
+            future.set_result(result)
+            return result
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _get_pages(
+        self,
+        endpoint: str,
+        params: Dict[str, Union[str, int]],
+        field: str,
+        next_params: Callable[
+            [Dict[Any, Any], Dict[str, Union[str, int]]],
+            Optional[Dict[str, Union[str, int]]],
+        ],
+        extend: Callable[[List, List], None] = list.extend,
+    ) -> Dict[Any, Any]:
+        """
+        Send GET requests for every page of a paginated response, returns the
+        first page with the items of all pages.
+
+        Args:
+            endpoint (str): endpoint for the request.
+            params (dict): parameters of the first page.
+            field (str): Name of the paginated list, e.g. 'events'.
+            next_params (callable): Gets the parameters of the next page from a
+                page and its parameters, or None on the last page.
+            extend (callable, optional): Appends the items of a page to the
+                items of the pages before it. Defaults to list.extend.
+
+        Raises:
+            ValueError: If the Api class is not initialized prior to execution.
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        cont: Optional[Dict] = None
+        items: List[Dict] = []
+        page_params: Optional[Dict[str, Union[str, int]]] = params
+
+        while page_params is not None:
+            page = self._get(
+                endpoint,
+                page_params,
+                parse=lambda raw: _parse_page(raw, field, items, extend),
             )
-        raise ConnectionError(f"Request failed: response is None")
+            if cont is None:
+                cont = page
+            page_params = next_params(page, page_params)
+
+        cont[field] = items
+        return cont
 
     def get_report_tables(
         self,
@@ -521,67 +1390,89 @@ class WCLApi:
             dict(JsonApiObject): JsonApi object in the form of a dict.
 
         """
-        try:
-            api_key = self.api_key
-        except AttributeError:
-            raise ValueError("Please initialise the Api class.")
+        query = ReportQuery(
+            view=view,
+            report_code=report_code,
+            start_time=start_time,
+            end_time=end_time,
+            hostility=hostility,
+            by=by,
+            sourceid=sourceid,
+            sourceinstance=sourceinstance,
+            sourceclass=sourceclass,
+            targetid=targetid,
+            targetinstance=targetinstance,
+            targetclass=targetclass,
+            abilityid=abilityid,
+            options=options,
+            cutoff=cutoff,
+            encounter=encounter,
+            wipes=wipes,
+            filter_exp=filter_exp,
+            translate=translate,
+        )
+        return self.query_report_tables(query, endpoint=endpoint)
 
-        headers: Dict[str, Union[str, int]] = {}
-
-        endpoint = endpoint.replace(":view", view).replace(":report_code", report_code)
-
-        params: Dict[str, Union[str, int]] = {}
-
-        if start_time is not None:
-            params.update({"start": start_time})
-        if end_time is not None:
-            params.update({"end": end_time})
-        if hostility is not None:
-            params.update({"hostility": hostility})
-        if by is not None:
-            params.update({"by": by})
-        if sourceid is not None:
-            params.update({"sourceid": sourceid})
-        if sourceinstance is not None:
-            params.update({"sourceinstance": sourceinstance})
-        if sourceclass is not None:
-            params.update({"sourceclass": sourceclass})
-        if targetid is not None:
-            params.update({"targetid": targetid})
-        if targetinstance is not None:
-            params.update({"targetinstance": targetinstance})
-        if targetclass is not None:
-            params.update({"targetclass": targetclass})
-        if abilityid is not None:
-            params.update({"abilityid": abilityid})
-        if options is not None:
-            params.update({"options": options})
-        if cutoff is not None:
-            params.update({"cutoff": cutoff})
-        if encounter is not None:
-            params.update({"encounter": encounter})
-        if wipes is not None:
-            params.update({"wipes": wipes})
-        if filter_exp is not None:
-            params.update({"filter": filter_exp})
-        if translate is not None:
-            params.update({"translate": translate})
-
-        params.update({"api_key": api_key})
-
-        resp = self.http.get(endpoint, headers=headers, params=params)
-
-        if resp.status_code == 200:
-            cont = resp.json()
-            return cont
+    def query_report_tables(
+        self, query: ReportQuery, endpoint: str = "report/tables/:view/:report_code"
+    ) -> Dict[Any, Any]:
+        """
+        Send a GET /report/tables request described by a ReportQuery to the
+        API, returns the report tables.
+
+        Args:
+            query (ReportQuery): The tables to be found.
+            endpoint (str, optional): endpoint for the request.
+                Defaults to r'report/tables/:view/:report_code'.
+
+        Raises:
+            ValueError: If the Api class is not initialized prior to execution.
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
+
+        Returns:
+            dict(JsonApiObject): JsonApi object in the form of a dict.
+        """
+        key_args = query.key_args(self._TABLES_KEY_ARGS)
+        key = self.make_file_name("tables", query.report_code, query.view, key_args)
+
+        endpoint = _format_endpoint(
+            endpoint, view=query.view, report_code=query.report_code
+        )
+
+        meta = {
+            "query": "tables",
+            "report_code": query.report_code,
+            "view": query.view,
+            **key_args,
+        }
+        return self._get_revalidated(
+            "tables", key, endpoint, query.params(_TABLES_PARAM_MAP), meta
+        )
+
+    def get_many_report_tables(
+        self, queries: Iterable[ReportQuery], concurrency: int = 16
+    ) -> List[Dict[Any, Any]]:
+        """
+        Request the tables of several ReportQuery objects concurrently from a
+        pool of threads.
+
+        Args:
+            queries (iterable of ReportQuery): The tables to be found.
+            concurrency (int, optional): Maximum number of queries requested
+                at the same time. Defaults to 16.
 
-        if resp.status_code == 401:
-            raise ConnectionError("Renew authorization token.")
+        Raises:
+            ValueError: If the Api class is not initialized prior to execution.
+            ConnectionError: Different Connectionerrors based on retrieved
+                ApiErrors.
 
-        raise ConnectionError(
-            f"Request failed with code {resp.status_code}"
-            f" and message : {resp.content}"
-            f" for endpoint: {endpoint}"
+        Returns:
+            list(dict): The tables of every query, in the order of queries.
+        """
+        return self.get_many(
+            (functools.partial(self.query_report_tables, q) for q in queries),
+            concurrency,
         )
 
     def get_encounter_rankings(
@@ -665,86 +1556,24 @@ class WCLApi:
         Returns:
             dict(JsonApiObject): JsonApi object in the form of a dict.
         """
-        try:
-            api_key = self.api_key
-        except AttributeError:
-            raise ValueError("Please initialise the Api class.")
+        endpoint = _format_endpoint(endpoint, encounter_id=encounter_id)
 
-        headers: Dict[str, Union[str, int]] = {}
-
-        endpoint = endpoint.replace(":encounter_id", str(encounter_id))
-
-        params: Dict[str, Union[str, int]] = {}
-
-        if metric is not None:
-            params.update({"metric": metric})
-        if size is not None:
-            params.update({"size": size})
-        if difficulty is not None:
-            params.update({"difficulty": difficulty})
-        if partition is not None:
-            params.update({"partition": partition})
-        if game_class is not None:
-            params.update({"class": game_class})
-        if spec is not None:
-            params.update({"spec": spec})
-        if bracket is not None:
-            params.update({"bracket": bracket})
-        if server is not None:
-            params.update({"server": server})
-        if region is not None:
-            params.update({"region": region})
-        if page is not None:
-            params.update({"page": page})
-        if limit is not None:
-            params.update({"limit": limit})
-        if filter is not None:
-            params.update({"filter": filter})
-        if include_combatant_info is not None:
-            params.update({"includeCombatantInfo": include_combatant_info})
-
-        params.update({"api_key": api_key})
-
-        resp = None
-        cont = None
-        next_page = True
-
-        while next_page:
-
-            resp = self.http.get(endpoint, headers=headers, params=params)
-
-            if resp.status_code == 200:
-
-                resp_json = resp.json()
-
-                if cont is not None:
-                    cont["rankings"] += resp_json["rankings"]
-                else:
-                    cont = resp_json
-
-                if next_page := resp_json["hasMorePages"]:
-                    params.update({"page": resp_json["page"] + 1})
-                    logger.debug(f"Additional page loaded: {resp_json['page'] + 1}")
-            else:
-                break
+        params = _build_params(_RANKINGS_PARAM_MAP, locals())
 
-        if resp:
-            if resp.status_code == 200:
-                if cont is not None:
-                    logger.debug(
-                        f"Content obtained successfully: {len(cont['rankings'])} "
-                        "rankings found"
-                    )
-                return cont
+        key_args = {"encounter_id": encounter_id, **params}
 
-            if resp.status_code == 401:
-                raise ConnectionError("Renew authorization token.")
+        content = self.load_saved_query("rankings", "", "", key_args)
+
+        if content is not None:
+            return content
 
-        raise ConnectionError(
-            f"Request failed with code {resp.status_code}"
-            f" and message : {resp.content}"
-            f" for endpoint: {endpoint}"
+        cont = self._get_pages(endpoint, params, "rankings", _next_rankings_page)
+
+        logger.debug(
+            f"Content obtained successfully: {len(cont['rankings'])} rankings found"
         )
+        self.save_query("rankings", "", "", key_args, cont)
+        return cont
 
     def get_zones(self, endpoint: str = r"zones") -> Iterable[Dict]:
         """
@@ -761,70 +1590,49 @@ class WCLApi:
         Returns:
             dict(JsonApiObject): JsonApi object in the form of a dict.
         """
-        try:
-            api_key = self.api_key
-        except AttributeError:
-            raise ValueError("Please initialise the Api class.")
-
-        headers: Dict[str, Union[str, int]] = {}
-
-        resp = None
-        cont = None
-
-        params: Dict[str, Union[str, int]] = {}
-        params.update({"api_key": api_key})
+        key = self.make_file_name("zones", "", "", {})
 
-        resp = self.http.get(endpoint, headers=headers, params=params)
-
-        if resp.status_code == 200:
-            cont = resp.json()
-            return cont
-
-        if resp.status_code == 401:
-            raise ConnectionError("Renew authorization token.")
-
-        raise ConnectionError(
-            f"Request failed with code {resp.status_code}"
-            f" and message : {resp.content}"
-            f" for endpoint: {endpoint}"
-        )
+        return self._get_revalidated("zones", key, endpoint, None, {"query": "zones"})
 
     def load_saved_query(
-        self, query: str, argspec: inspect.ArgInfo
+        self, query: str, report_code: str, view: str, key_args: Dict[str, Any]
     ) -> Union[Iterable[Dict], Dict, None]:
-        if self.query_dir is None:
-            return None
-        f_name = self.make_file_name(argspec, query)
-        if not os.path.isdir(self.query_dir):
+        if self.cache is None:
             return None
-        f_path = os.path.join(self.query_dir, f_name)
-        if not os.path.isfile(f_path):
+        return self.cache.get(self.make_file_name(query, report_code, view, key_args))
+
+    def load_stale_query(
+        self,
+        query: str,
+        report_code: str,
+        view: str,
+        key_args: Dict[str, Any],
+        max_stale: Optional[float] = DEFAULT_GRACE,
+    ) -> Union[Iterable[Dict], Dict, None]:
+        if self.cache is None:
             return None
-        with open(f_path, "r") as f:
-            return json.load(f)
+        return self.cache.get_stale(
+            self.make_file_name(query, report_code, view, key_args), max_stale
+        )
 
     def save_query(
-        self, query: str, argspec: inspect.ArgInfo, cont: Union[Iterable[Dict], Dict]
+        self,
+        query: str,
+        report_code: str,
+        view: str,
+        key_args: Dict[str, Any],
+        cont: Union[Iterable[Dict], Dict],
     ) -> None:
-        if self.query_dir is None:
+        if self.cache is None:
             return None
-        f_name = self.make_file_name(argspec, query)
-        if not os.path.isdir(self.query_dir):
-            os.mkdir(self.query_dir)
-        f_path = os.path.join(self.query_dir, f_name)
-        with open(f_path, "w") as f:
-            json.dump(cont, f)
-
-    def make_file_name(self, argspec: inspect.ArgInfo, query: str) -> str:
-        arg_str = "_".join(
-            [argspec.locals["report_code"]]
-            + [
-                str(argspec.locals[arg])
-                for arg in argspec.args
-                if argspec.locals[arg] is not None
-                and not isinstance(argspec.locals[arg], WCLApi)
-                and arg not in ["endpoint", "report_code", "view"]
-            ]
-            + [argspec.locals["view"]]
+        self.cache.set(
+            self.make_file_name(query, report_code, view, key_args),
+            cont,
+            ttl=self._cache_ttl(query, report_code),
+            meta={"query": query, "report_code": report_code, "view": view, **key_args},
         )
-        return f"wcl_{query}_{arg_str}.json"
+
+    def make_file_name(
+        self, query: str, report_code: str, view: str, key_args: Dict[str, Any]
+    ) -> str:
+        return _file_name(query, (report_code, view, *sorted(key_args.items())))
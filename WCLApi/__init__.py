@@ -1,2 +1,6 @@
+from WCLApi.ApiError import ApiError
 from WCLApi.TimeoutHttpAdapter import TimeoutHttpAdapter
-from WCLApi.Warcraftlogs import WCLApi
\ No newline at end of file
+from WCLApi.RateLimiter import RateLimiter
+from WCLApi.ReportQuery import ReportQuery
+from WCLApi.Warcraftlogs import WCLApi
+from WCLApi.AsyncWarcraftlogs import AsyncWCLApi
@@ -0,0 +1,15 @@
+import sys
+from os.path import join, dirname
+
+sys.path.append(join(dirname(__file__), ".."))
+
+from WCLApi.ApiError import ERROR_BODY_SIZE, ApiError
+
+
+def test_api_error_keeps_the_start_of_the_body():
+    error = ApiError(500, "report/fights/abc", b"x" * (10 * ERROR_BODY_SIZE))
+    assert isinstance(error, ConnectionError)
+    assert error.status_code == 500
+    assert len(error.body) == ERROR_BODY_SIZE
+    assert "code 500" in str(error)
+    assert "report/fights/abc" in str(error)
@@ -0,0 +1,246 @@
+import asyncio
+import math
+import sys
+from os.path import join, dirname
+
+import httpx
+import pytest
+
+sys.path.append(join(dirname(__file__), ".."))
+
+from WCLApi.AsyncWarcraftlogs import AsyncWCLApi
+from WCLApi.ReportQuery import ReportQuery
+from WCLApi.Warcraftlogs import WCLApi, _extend_events
+from test_warcraftlogs import FakeAdapter
+
+
+def make_api(handler, **kwargs):
+    api = AsyncWCLApi("key", base_url="https://wcl.test/v1/", rate_limit=None, **kwargs)
+    api._http = httpx.AsyncClient(
+        base_url=api.base_url,
+        params={"api_key": api.api_key},
+        transport=httpx.MockTransport(handler),
+    )
+    return api
+
+
+def test_arguments_after_the_api_key_are_keyword_only():
+    with pytest.raises(TypeError):
+        AsyncWCLApi("key", "saved_queries")
+
+
+def events_server(events, page_size, requests):
+    """Serve /report/events pages the way WCL does: every page starts at
+    the start parameter and nextPageTimestamp is the timestamp of the first
+    event left out, so events sharing that timestamp are sent again."""
+
+    def handler(request):
+        params = dict(request.url.params)
+        requests.append(params)
+        start = int(params.get("start", 0))
+        end = int(params["end"]) if "end" in params else math.inf
+        selected = [e for e in events if start <= e["timestamp"] <= end]
+        body = {"events": selected[:page_size]}
+        if len(selected) > page_size:
+            body["nextPageTimestamp"] = selected[page_size]["timestamp"]
+        return httpx.Response(200, json=body)
+
+    return handler
+
+
+def query_events(api, **kwargs):
+    query = ReportQuery(view="casts", report_code="abc", **kwargs)
+
+    async def run():
+        async with api:
+            return await api.query_report_events(query)
+
+    return asyncio.run(run())["events"]
+
+
+def test_extend_events_skips_only_the_repeated_boundary_events():
+    a, b, c = {"timestamp": 5, "id": 1}, {"timestamp": 5, "id": 2}, {"timestamp": 6}
+    events = [{"timestamp": 4}, a, b]
+    _extend_events(events, [a, b, a, c])
+    assert events == [{"timestamp": 4}, a, b, a, c]
+    events = [a]
+    _extend_events(events, [a, a, c])
+    assert events == [a, a, c]
+
+
+def test_windows_split_the_range_up_to_the_end():
+    events = [{"timestamp": t} for t in range(100)]
+    requests = []
+    api = make_api(events_server(events, 10, requests), prefetch_pages=4)
+    assert query_events(api, start_time=0, end_time=99) == events
+    sent = {(r.get("start"), r.get("end")) for r in requests}
+    assert {("10", "20"), ("20", "30"), ("30", "40"), ("40", "99")} <= sent
+    assert all(int(r["end"]) <= 99 for r in requests)
+
+
+def test_windows_without_an_end_leave_the_last_window_open():
+    events = [{"timestamp": t} for t in range(100)]
+    requests = []
+    api = make_api(events_server(events, 10, requests), prefetch_pages=4)
+    assert query_events(api) == events
+    sent = {(r.get("start"), r.get("end")) for r in requests}
+    assert {("10", "20"), ("20", "30"), ("30", "40"), ("40", None)} <= sent
+
+
+def test_windows_overlap_without_losing_or_repeating_events():
+    tick = {"timestamp": 20, "type": "tick"}
+    events = (
+        [{"timestamp": t} for t in range(10)]
+        + [{"timestamp": 10, "id": i} for i in range(3)]
+        + [{"timestamp": t} for t in range(11, 20)]
+        + [tick, tick, tick]
+        + [{"timestamp": t} for t in range(21, 60)]
+    )
+    api = make_api(events_server(events, 10, []), prefetch_pages=4)
+    assert query_events(api, start_time=0, end_time=59) == events
+
+
+def test_identical_events_on_a_page_boundary_are_kept():
+    tick = {"timestamp": 9, "type": "tick"}
+    events = [{"timestamp": t} for t in range(9)] + [tick] * 4 + [{"timestamp": 10}]
+    api = make_api(events_server(events, 10, []), prefetch_pages=1)
+    assert query_events(api) == events
+
+
+def sync_events(events, page_size, iterate):
+    """Query the events from events_server with the synchronous client."""
+
+    def handler(request):
+        resp = events_server(events, page_size, [])(
+            httpx.Request(request.method, request.url)
+        )
+        return resp.status_code, dict(resp.headers), resp.content
+
+    api = WCLApi("key", base_url="https://wcl.test/v1/", rate_limit=None)
+    api.http.mount("https://", FakeAdapter(handler))
+    query = ReportQuery(view="casts", report_code="abc")
+    if iterate:
+        return list(api.iter_report_events(query))
+    return api.query_report_events(query)["events"]
+
+
+BOUNDARY_CASES = {
+    "distinct": [{"timestamp": t // 3, "id": t} for t in range(30)],
+    "identical": [{"timestamp": t} for t in range(9)]
+    + [{"timestamp": 9, "type": "tick"}] * 4
+    + [{"timestamp": 10}],
+}
+
+
+@pytest.mark.parametrize("case", BOUNDARY_CASES)
+def test_both_clients_return_every_event_once(case):
+    events = BOUNDARY_CASES[case]
+    api = make_api(events_server(events, 10, []), prefetch_pages=1)
+    assert query_events(api) == events
+    assert sync_events(events, 10, iterate=False) == events
+    assert sync_events(events, 10, iterate=True) == events
+
+
+def test_a_wrong_density_estimate_costs_requests_but_not_events():
+    sparse = [{"timestamp": t} for t in range(10)]
+    burst = [{"timestamp": 10 + t // 4, "id": t} for t in range(40)]
+    late = [{"timestamp": t} for t in (1000, 5000, 9000)]
+    events = sparse + burst + late
+    requests = []
+    api = make_api(events_server(events, 10, requests), prefetch_pages=3)
+    assert query_events(api) == events
+    assert len(requests) > 4
+
+
+def rankings_server(rankings, per_page, count, requests, running):
+    """Serve /rankings/encounter pages, counting the requests in flight."""
+
+    async def handler(request):
+        page = int(request.url.params.get("page", 1))
+        requests.append(page)
+        running.append(running[-1] + 1)
+        await asyncio.sleep(0.01)
+        running.append(running[-1] - 1)
+        chunk = rankings[(page - 1) * per_page : page * per_page]
+        body = {
+            "page": page,
+            "hasMorePages": page * per_page < len(rankings),
+            "rankings": chunk,
+        }
+        if count is not None:
+            body["count"] = count
+        return httpx.Response(200, json=body)
+
+    return handler
+
+
+def query_rankings(api):
+    async def run():
+        async with api:
+            return await api.get_encounter_rankings(1)
+
+    return asyncio.run(run())
+
+
+def test_rankings_pages_are_batched_once_the_count_is_known():
+    rankings = [{"rank": i} for i in range(23)]
+    requests, running = [], [0]
+    handler = rankings_server(rankings, 5, 23, requests, running)
+    api = make_api(handler, prefetch_pages=2)
+    assert query_rankings(api)["rankings"] == rankings
+    assert sorted(requests) == [1, 2, 3, 4, 5]
+    assert max(running) == 2
+
+
+def test_rankings_pages_are_sequential_without_a_count():
+    rankings = [{"rank": i} for i in range(23)]
+    requests, running = [], [0]
+    handler = rankings_server(rankings, 5, None, requests, running)
+    api = make_api(handler, prefetch_pages=4)
+    assert query_rankings(api)["rankings"] == rankings
+    assert requests == [1, 2, 3, 4, 5]
+    assert max(running) == 1
+
+
+def test_a_wrong_rankings_count_neither_loses_nor_repeats_rankings():
+    rankings = [{"rank": i} for i in range(12)]
+    requests = []
+    handler = rankings_server(rankings, 5, 100, requests, [0])
+    cont = query_rankings(make_api(handler, prefetch_pages=4))
+    assert cont["rankings"] == rankings
+    assert cont["hasMorePages"] is False
+    assert sorted(requests) == [1, 2, 3, 4, 5]
+
+    requests = []
+    handler = rankings_server(rankings, 5, 5, requests, [0])
+    assert query_rankings(make_api(handler, prefetch_pages=4))["rankings"] == rankings
+    assert requests == [1, 2, 3]
+
+
+def test_identical_queries_in_flight_share_one_request():
+    requests = []
+    release = asyncio.Event()
+
+    async def handler(request):
+        requests.append(request)
+        await release.wait()
+        return httpx.Response(200, json={"events": [{"timestamp": 1}]})
+
+    api = make_api(handler)
+    query = ReportQuery(view="casts", report_code="abc")
+
+    async def run():
+        async with api:
+            first = asyncio.ensure_future(api.query_report_events(query))
+            second = asyncio.ensure_future(api.query_report_events(query))
+            while not requests:
+                await asyncio.sleep(0)
+            first.cancel()
+            release.set()
+            result = await second
+            assert first.cancelled()
+            assert not api._inflight
+            return result
+
+    assert asyncio.run(run()) == {"events": [{"timestamp": 1}]}
+    assert len(requests) == 1
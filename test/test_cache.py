@@ -0,0 +1,214 @@
+import shutil
+import sys
+import time
+from os.path import join, dirname
+
+sys.path.append(join(dirname(__file__), ".."))
+
+import pytest
+
+from WCLApi.Cache import (
+    DEFAULT_GRACE,
+    HEADER_MAGIC,
+    _HEADER,
+    Cache,
+    DiskCache,
+    MemoryCache,
+)
+
+
+def test_disk_cache_roundtrip(tmp_path):
+    cache = DiskCache(str(tmp_path / "queries"))
+    assert cache.get("wcl_events_key.json") is None
+    cont = {"events": [{"timestamp": 1}], "count": 1}
+    cache.set("wcl_events_key.json", cont, ttl=60)
+    assert cache.get("wcl_events_key.json") == cont
+    assert cache.get_stale("wcl_events_key.json") == cont
+
+
+def test_memory_cache_serves_hits_from_memory(tmp_path):
+    backend = DiskCache(str(tmp_path / "queries"))
+    cache = MemoryCache(backend, maxsize=1)
+    cache.set("a.json", {"a": 1}, ttl=60)
+    (tmp_path / "queries" / "a.json").unlink()
+    assert cache.get("a.json") == {"a": 1}
+    cache.set("b.json", {"b": 1}, ttl=60)
+    assert cache.get("a.json") is None
+    assert cache.get("b.json") == {"b": 1}
+
+
+def test_disk_cache_expires_values_stored_with_a_ttl(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path / "queries"))
+    cache.set("live.json", {"live": 1}, ttl=60)
+    cache.set("done.json", {"done": 1})
+    assert cache.get("live.json") == {"live": 1}
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get("live.json") is None
+    assert cache.get_stale("live.json") == {"live": 1}
+    assert cache.get("done.json") == {"done": 1}
+
+
+def test_disk_cache_keeps_the_stale_time_in_the_file(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path))
+    cache.set("now.json", [1], ttl=0)
+    assert cache.get("now.json") is None
+    assert cache.get_stale("now.json") == [1]
+    cache.set("live.json", [2], ttl=60)
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+    shutil.copy2(tmp_path / "live.json", tmp_path / "copy.json")
+    assert cache.get("copy.json") is None
+    (tmp_path / "legacy.json").write_bytes(b"[3]")
+    assert cache.get("legacy.json") == [3]
+
+
+def test_disk_cache_reads_compressed_and_plain_files(tmp_path):
+    cont = {"events": [{"timestamp": 1}] * 100}
+    DiskCache(str(tmp_path), compresslevel=None).set("plain.json", cont)
+    cache = DiskCache(str(tmp_path))
+    cache.set("gzip.json", cont)
+    plain_size = (tmp_path / "plain.json").stat().st_size
+    assert (tmp_path / "gzip.json").stat().st_size < plain_size
+    assert cache.get("plain.json") == cont
+    assert cache.get("gzip.json") == cont
+
+
+def test_disk_cache_index_answers_misses_from_the_listing(tmp_path):
+    DiskCache(str(tmp_path)).set("old.json", [1])
+    cache = DiskCache(str(tmp_path), index=True)
+    assert cache.get("old.json") == [1]
+    DiskCache(str(tmp_path)).set("other.json", [2])
+    assert cache.get("other.json") is None
+    cache.set("new.json", [3])
+    assert cache.get("new.json") == [3]
+
+
+def test_disk_cache_write_back_buffers_until_flushed(tmp_path):
+    cache = DiskCache(str(tmp_path), write_back=3)
+    cache.set("a.json", [1])
+    cache.set("b.json", [2])
+    assert not (tmp_path / "a.json").exists()
+    assert cache.get("a.json") == [1]
+    cache.set("c.json", [3])
+    assert DiskCache(str(tmp_path)).get("a.json") == [1]
+    cache.set("d.json", [4])
+    cache.flush()
+    assert DiskCache(str(tmp_path)).get("d.json") == [4]
+
+
+def test_memory_cache_prefetches_from_the_backend(tmp_path):
+    backend = DiskCache(str(tmp_path))
+    backend.set("a.json", [1])
+    cache = MemoryCache(backend)
+    cache.prefetch(["a.json", "missing.json"])
+    assert cache.get("a.json") == [1]
+    assert cache.get("missing.json") is None
+    (tmp_path / "a.json").unlink()
+    assert cache.get("a.json") == [1]
+
+
+def test_memory_cache_returns_copies_and_bounds_its_size(tmp_path):
+    cache = MemoryCache(DiskCache(str(tmp_path)), max_bytes=100)
+    cache.set("a.json", {"events": [1]}, ttl=60)
+    cache.get("a.json")["events"].append(2)
+    assert cache.get("a.json") == {"events": [1]}
+    cache.set("big.json", list(range(100)), ttl=60)
+    assert "big.json" not in cache._entries
+    assert cache.get("big.json") == list(range(100))
+    cache.set("old.json", [1], ttl=0)
+    cache.set("b.json", [2], ttl=60)
+    assert "old.json" not in cache._entries
+    assert cache._size <= 100
+
+
+def test_cache_backends_must_implement_get_and_set():
+    with pytest.raises(TypeError):
+        Cache()
+
+
+def test_get_stale_honours_max_stale(tmp_path, monkeypatch):
+    cache = MemoryCache(DiskCache(str(tmp_path)))
+    cache.set("live.json", [1], ttl=60)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 60 + DEFAULT_GRACE / 2)
+    assert cache.get("live.json") is None
+    assert cache.get_stale("live.json", DEFAULT_GRACE) == [1]
+    monkeypatch.setattr(time, "time", lambda: now + 60 + DEFAULT_GRACE * 2)
+    assert cache.get_stale("live.json", DEFAULT_GRACE) is None
+    assert cache.get_stale("live.json") == [1]
+
+
+def test_memory_cache_drops_values_when_they_go_stale_in_the_backend(
+    tmp_path, monkeypatch
+):
+    backend = DiskCache(str(tmp_path / "queries"))
+    backend.set("live.json", {"live": 1}, ttl=2)
+    backend.set("done.json", {"done": 1})
+    cache = MemoryCache(backend, ttl=30)
+    now = time.time()
+    assert cache.get("live.json") == {"live": 1}
+    assert cache.get("done.json") == {"done": 1}
+    (tmp_path / "queries" / "done.json").unlink()
+
+    monkeypatch.setattr(time, "time", lambda: now + 2.5)
+    assert backend.get("live.json") is None
+    assert cache.get("live.json") is None
+    assert cache.get("done.json") == {"done": 1}
+    monkeypatch.setattr(time, "time", lambda: now + 31)
+    assert cache.get("done.json") is None
+
+    cache.set("long.json", {"long": 1}, ttl=100)
+    (tmp_path / "queries" / "long.json").unlink()
+    assert cache.get("long.json") == {"long": 1}
+    monkeypatch.setattr(time, "time", lambda: now + 62)
+    assert cache.get("long.json") is None
+
+
+def test_disk_cache_writes_the_meta_file_only_when_asked(tmp_path):
+    DiskCache(str(tmp_path)).set("a.json", [1], meta={"query": "events"})
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.json"]
+    DiskCache(str(tmp_path), meta=True).set("b.json", [2], meta={"query": "events"})
+    assert (tmp_path / "b.meta.json").exists()
+
+
+def test_touch_resets_the_stale_time_without_storing_the_value(
+    tmp_path, monkeypatch
+):
+    cache = DiskCache(str(tmp_path))
+    cache.set("a.json", {"a": 1}, ttl=10)
+    body = (tmp_path / "a.json").read_bytes()[_HEADER.size :]
+    writes = []
+    monkeypatch.setattr(cache, "_write", lambda *args: writes.append(args))
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 20)
+    assert cache.get("a.json") is None
+    cache.touch("a.json", ttl=10)
+    assert cache.get("a.json") == {"a": 1}
+    assert (tmp_path / "a.json").read_bytes()[_HEADER.size :] == body
+    assert writes == []
+    monkeypatch.setattr(time, "time", lambda: now + 40)
+    assert cache.get("a.json") is None
+    cache.touch("missing.json", ttl=10)
+    assert writes == []
+
+    memory = MemoryCache(cache, ttl=None)
+    monkeypatch.setattr(time, "time", lambda: now + 20)
+    cache.touch("a.json", ttl=10)
+    assert memory.get("a.json") == {"a": 1}
+    memory.touch("a.json", ttl=0)
+    assert memory.get("a.json") is None
+
+
+def test_touch_stores_files_without_a_header_again(tmp_path):
+    (tmp_path / "old.json").write_bytes(b'{"old": 1}')
+    cache = DiskCache(str(tmp_path), compresslevel=None)
+    cache.touch("old.json", ttl=60)
+    assert (tmp_path / "old.json").read_bytes()[:4] == HEADER_MAGIC
+    assert cache.get("old.json") == {"old": 1}
+
+    pending = DiskCache(str(tmp_path), write_back=10)
+    pending.set("new.json", [1], ttl=0)
+    assert pending.get("new.json") is None
+    pending.touch("new.json", ttl=60)
+    assert pending.get("new.json") == [1]
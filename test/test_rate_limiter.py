@@ -0,0 +1,18 @@
+import sys
+import time
+from os.path import join, dirname
+
+sys.path.append(join(dirname(__file__), ".."))
+
+from WCLApi.RateLimiter import RateLimiter
+
+
+def test_rate_limiter_allows_a_burst_then_spreads_requests():
+    limiter = RateLimiter(max_rate=2, time_period=0.2)
+    start = time.monotonic()
+    limiter.acquire()
+    limiter.acquire()
+    assert time.monotonic() - start < 0.05
+    limiter.acquire()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.19
@@ -0,0 +1,387 @@
+import contextlib
+import gzip
+import io
+import json
+import logging
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os.path import join, dirname
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ChunkedEncodingError, RequestException
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+
+sys.path.append(join(dirname(__file__), ".."))
+
+from WCLApi import Warcraftlogs
+from WCLApi.ApiError import ERROR_BODY_SIZE, ApiError
+from WCLApi.Cache import DEFAULT_GRACE, DiskCache
+from WCLApi.ReportQuery import ReportQuery
+from WCLApi.Warcraftlogs import (
+    CACHE_POLICY,
+    COMPLETED_REPORT_AGE,
+    WCLApi,
+    _iter_page,
+    _read_body,
+)
+
+
+class FakeAdapter(HTTPAdapter):
+    """Answers requests with handler(request) -> (status, headers, body)."""
+
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        status, headers, body = self.handler(request)
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers=headers,
+            status=status,
+            preload_content=False,
+        )
+        return self.build_response(request, raw)
+
+
+def query_params(request):
+    return dict(parse_qsl(urlsplit(request.url).query))
+
+
+def make_api(tmp_path, handler=None, **kwargs):
+    api = WCLApi("key", query_dir=str(tmp_path), rate_limit=None, **kwargs)
+    if handler is not None:
+        api.adapter = FakeAdapter(handler)
+        api.http.mount("https://", api.adapter)
+    return api
+
+
+def cache_fights(api, report_code, end):
+    key = api.make_file_name("fights", report_code, "", {})
+    api.cache.set(key, {"etag": None, "last_modified": None, "body": {"end": end}})
+
+
+def test_cache_ttl_follows_the_end_of_the_report(tmp_path):
+    api = make_api(tmp_path)
+    assert api._cache_ttl("events", "unknown") is None
+    assert api._cache_ttl("tables", "unknown") == CACHE_POLICY["tables"]
+    assert api._cache_ttl("rankings", "") == CACHE_POLICY["rankings"]
+    cache_fights(api, "live", time.time() * 1000)
+    assert api._cache_ttl("events", "live") == CACHE_POLICY["events"]
+    assert api._cache_ttl("events", "live", max_age=5) == 5
+    cache_fights(api, "done", (time.time() - 2 * COMPLETED_REPORT_AGE) * 1000)
+    assert api._cache_ttl("events", "done") is None
+    assert api._cache_ttl("tables", "done") is None
+
+
+@pytest.mark.parametrize("cache_control", ["max-age=0", "no-cache"])
+def test_max_age_0_revalidates_every_request(tmp_path, monkeypatch, cache_control):
+    end = (time.time() - 2 * COMPLETED_REPORT_AGE) * 1000
+
+    def handler(request):
+        headers = {"ETag": '"v1"', "Cache-Control": cache_control}
+        if request.headers.get("If-None-Match") == '"v1"':
+            return 304, headers, b""
+        return 200, headers, {"end": end, "fights": []}
+
+    api = make_api(tmp_path, handler)
+    disk, writes = api.cache.backend, []
+
+    def write(name, *args):
+        writes.append(name)
+        DiskCache._write(disk, name, *args)
+
+    monkeypatch.setattr(disk, "_write", write)
+    bodies = [api.get_report_fights("abc") for _ in range(3)]
+    assert bodies[0] == bodies[1] == bodies[2]
+    sent = [r.headers.get("If-None-Match") for r in api.adapter.requests]
+    assert sent == [None, '"v1"', '"v1"']
+    assert len(writes) == 1
+
+
+def test_retried_errors_raise_an_api_error(monkeypatch):
+    hits = []
+
+    class Unavailable(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            body = b"<html>" + b"x" * 100000 + b"</html>"
+            self.send_response(503)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Unavailable)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(Warcraftlogs, "RETRY_BACKOFF_FACTOR", 0)
+    monkeypatch.setattr(WCLApi, "_adapters", {})
+    api = WCLApi(
+        "key", base_url=f"http://127.0.0.1:{server.server_port}/v1/", rate_limit=None
+    )
+    try:
+        with pytest.raises(ApiError) as excinfo:
+            api.get_zones()
+    finally:
+        server.shutdown()
+    assert excinfo.value.status_code == 503
+    assert len(excinfo.value.body) == ERROR_BODY_SIZE
+    assert len(hits) == Warcraftlogs.RETRY_TOTAL + 1
+
+
+@contextlib.contextmanager
+def stalled_server(body):
+    """Serve half of body, then stall until the test is done."""
+    release = threading.Event()
+
+    class Stalled(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            release.wait(5)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Stalled)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/v1/"
+    finally:
+        release.set()
+        server.shutdown()
+
+
+def test_a_stalled_events_page_raises_a_request_exception(tmp_path, monkeypatch):
+    events = {"events": [{"timestamp": t} for t in range(1000)]}
+    query = ReportQuery(view="casts", report_code="abc")
+    with stalled_server(json.dumps(events).encode()) as base_url:
+        api = WCLApi(
+            "key",
+            query_dir=str(tmp_path),
+            base_url=base_url,
+            timeout=0.2,
+            rate_limit=None,
+        )
+        with pytest.raises(RequestException):
+            api.query_report_events(query)
+        with pytest.raises(RequestException):
+            list(api.iter_report_events(query))
+
+        key_args = query.key_args(api._EVENTS_KEY_ARGS)
+        cache_fights(api, "abc", time.time() * 1000)
+        api.save_query("events", "abc", "casts", key_args, {"events": []})
+        later = time.time() + CACHE_POLICY["events"] + DEFAULT_GRACE / 2
+        monkeypatch.setattr(time, "time", lambda: later)
+        assert api.query_report_events(query) == {"events": []}
+
+
+def test_stale_events_are_served_within_the_grace_window(tmp_path, monkeypatch):
+    status = {"events": 200}
+
+    def handler(request):
+        if status["events"] == 200:
+            return 200, {}, {"events": [{"timestamp": 1}], "count": 1}
+        return status["events"], {}, {"error": "down"}
+
+    api = make_api(tmp_path, handler)
+    cache_fights(api, "live", time.time() * 1000)
+    query = ReportQuery(view="damage-done", report_code="live")
+    events = api.query_report_events(query)
+    now = time.time()
+    ttl = CACHE_POLICY["events"]
+
+    status["events"] = 500
+    monkeypatch.setattr(time, "time", lambda: now + ttl + DEFAULT_GRACE / 2)
+    assert api.query_report_events(query) == events
+    status["events"] = 401
+    with pytest.raises(ConnectionError, match="Renew"):
+        api.query_report_events(query)
+    status["events"] = 500
+    monkeypatch.setattr(time, "time", lambda: now + ttl + DEFAULT_GRACE * 2)
+    with pytest.raises(ApiError):
+        api.query_report_events(query)
+
+
+def test_conditional_requests_reuse_or_replace_the_cached_body(tmp_path, monkeypatch):
+    end = time.time() * 1000
+    version = {"etag": '"v1"', "body": {"end": end, "fights": [1]}}
+
+    def handler(request):
+        headers = {
+            "ETag": version["etag"],
+            "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+            "Cache-Control": "max-age=30",
+        }
+        if request.headers.get("If-None-Match") == version["etag"]:
+            return 304, headers, b""
+        return 200, headers, version["body"]
+
+    api = make_api(tmp_path, handler)
+    assert api.get_report_fights("abc") == {"end": end, "fights": [1]}
+    assert api.get_report_fights("abc") == {"end": end, "fights": [1]}
+    first = api.adapter.requests[0]
+    assert "If-None-Match" not in first.headers
+    assert "If-Modified-Since" not in first.headers
+    assert len(api.adapter.requests) == 1
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 60)
+    assert api.get_report_fights("abc") == {"end": end, "fights": [1]}
+    revalidated = api.adapter.requests[1]
+    assert revalidated.headers["If-None-Match"] == '"v1"'
+    assert revalidated.headers["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+    version.update(etag='"v2"', body={"end": end, "fights": [1, 2]})
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    assert api.get_report_fights("abc") == {"end": end, "fights": [1, 2]}
+    key = api.make_file_name("fights", "abc", "", {})
+    assert api.cache.get_stale(key)["etag"] == '"v2"'
+    monkeypatch.setattr(time, "time", lambda: now + 180)
+    assert api.get_report_fights("abc") == {"end": end, "fights": [1, 2]}
+    assert api.adapter.requests[-1].headers["If-None-Match"] == '"v2"'
+
+
+def test_iter_page_yields_items_and_keeps_the_envelope():
+    body = {
+        "count": 4,
+        "events": [
+            {"timestamp": 1, "source": {"id": 2, "auras": [{"id": 3}]}},
+            7,
+            [8, [9]],
+            None,
+        ],
+        "nextPageTimestamp": 10,
+    }
+    page = {}
+    items = list(_iter_page(io.BytesIO(json.dumps(body).encode()), "events", page))
+    assert items == body["events"]
+    assert page == {"count": 4, "nextPageTimestamp": 10}
+
+
+def test_iter_page_stops_reading_when_closed_early():
+    stream = io.BytesIO(json.dumps({"events": list(range(100000))}).encode())
+    page = {}
+    items = _iter_page(stream, "events", page)
+    assert [next(items) for _ in range(3)] == [0, 1, 2]
+    items.close()
+    assert page == {}
+    assert stream.tell() < len(stream.getvalue())
+
+
+def test_iter_report_events_follows_pages_until_the_caller_stops(tmp_path):
+    def handler(request):
+        start = int(query_params(request).get("start", 0))
+        events = [{"timestamp": t} for t in range(start, start + 3)]
+        return 200, {}, {"events": events, "nextPageTimestamp": start + 3}
+
+    api = make_api(tmp_path, handler)
+    events = api.iter_report_events(ReportQuery(view="casts", report_code="abc"))
+    taken = [next(events)["timestamp"] for _ in range(5)]
+    events.close()
+    assert taken == [0, 1, 2, 3, 4]
+    assert len(api.adapter.requests) == 2
+
+
+def streamed_response(body, headers, **kwargs):
+    resp = Response()
+    resp.status_code = 200
+    resp.headers = CaseInsensitiveDict(headers)
+    resp.raw = HTTPResponse(
+        body=io.BytesIO(body), headers=headers, preload_content=False, **kwargs
+    )
+    return resp
+
+
+def test_read_body_fills_a_buffer_of_the_content_length():
+    body = json.dumps({"events": list(range(10000))}).encode()
+    resp = streamed_response(body, {"Content-Length": str(len(body))})
+    assert _read_body(resp) == body
+    short = streamed_response(body[:100], {"Content-Length": str(len(body))})
+    with pytest.raises(ChunkedEncodingError):
+        _read_body(short)
+    unenforced = streamed_response(
+        body[:100], {"Content-Length": str(len(body))}, enforce_content_length=False
+    )
+    assert _read_body(unenforced) == body[:100]
+
+
+def test_a_stalled_body_raises_a_request_exception():
+    body = json.dumps({"end": 0, "fights": list(range(10000))}).encode()
+    with stalled_server(body) as base_url:
+        api = WCLApi("key", base_url=base_url, timeout=0.2, rate_limit=None)
+        with pytest.raises(RequestException):
+            api.get_report_fights("abc")
+
+
+def test_read_body_decodes_compressed_bodies_in_chunks():
+    body = json.dumps({"events": list(range(10000))}).encode()
+    compressed = gzip.compress(body)
+    resp = streamed_response(
+        compressed,
+        {"Content-Length": str(len(compressed)), "Content-Encoding": "gzip"},
+    )
+    assert _read_body(resp) == body
+
+
+def test_identical_queries_in_flight_share_one_request(tmp_path, caplog):
+    caplog.set_level(logging.DEBUG, logger=Warcraftlogs.__name__)
+    entered, release = threading.Event(), threading.Event()
+    status = {"events": 200}
+
+    def handler(request):
+        entered.set()
+        release.wait(5)
+        if status["events"] == 200:
+            return 200, {}, {"events": [{"timestamp": 1}]}
+        return status["events"], {}, {"error": "down"}
+
+    def query_in_threads(api, query):
+        results = [None, None]
+
+        def run(i):
+            try:
+                results[i] = api.query_report_events(query)
+            except Exception as exc:
+                results[i] = exc
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+        threads[0].start()
+        assert entered.wait(5)
+        threads[1].start()
+        deadline = time.time() + 5
+        while "identical request" not in caplog.text and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        entered.clear()
+        release.clear()
+        caplog.clear()
+        return results
+
+    api = make_api(tmp_path, handler)
+    first, second = query_in_threads(api, ReportQuery(view="casts", report_code="a"))
+    assert first == second == {"events": [{"timestamp": 1}]}
+    assert len(api.adapter.requests) == 1
+
+    status["events"] = 500
+    first, second = query_in_threads(api, ReportQuery(view="casts", report_code="b"))
+    assert isinstance(first, ApiError) and first is second
+    assert len(api.adapter.requests) == 2
+    assert not api._inflight